@@ -5,17 +5,22 @@ import os
 from dotenv import load_dotenv
 import sys
 
-# Add the path BEFORE importing etl modules
+# Add the path so the task callables can import etl
 sys.path.append('/home/kevin/concert-prices')
 
-# Now we can import from etl
-from etl.extract import track_current_events
-from etl.transform import transform
-from etl.load import load_to_sql
+# The scheduler re-parses this file on every loop, so etl (and pandas,
+# psycopg2 with it) is only imported inside the task callables.
 
 # Load environment variables
 load_dotenv()
 
+# Tracked events are split into this many extract/load shards by event_id hash.
+# Shards run in separate processes, each with its own API client, so each one
+# gets 1/NUM_SHARDS of the key's request rate (see extract). The daily quota
+# needs no split: calls are counted per UTC day in the database, so every shard
+# and every hourly run draws on the same total.
+NUM_SHARDS = int(os.getenv('TICKET_TRAIL_SHARDS', 4))
+
 # Define default arguments
 default_args = {
     'owner': 'your_name',
@@ -28,49 +33,130 @@ default_args = {
 dag = DAG(
     'ticket_trail',
     default_args=default_args,
-    description='Track ticket prices daily',
-    schedule_interval='@daily',
+    description='Track ticket prices for events that are due a check',
+    # Runs hourly; each event is only fetched when its next_poll_at has passed
+    schedule_interval='@hourly',
     catchup=False
 )
 
-# Split into separate tasks
-def extract():
-    events_df, event_details_df = track_current_events()
+# Split into separate tasks, each with its own short-lived connection pool.
+# DataFrames travel between tasks as Parquet files; XCom only carries their paths.
+# A mapped load can run on a different worker than its extract, so the files
+# must live on storage every worker sees: TICKET_TRAIL_STAGING_DIR is required.
+# Each task reports its own metrics (JSON in the task log, plus a Prometheus
+# textfile when TICKET_TRAIL_METRICS_DIR is set).
+def require_staging_dir():
+    if not os.getenv('TICKET_TRAIL_STAGING_DIR'):
+        raise RuntimeError(
+            "TICKET_TRAIL_STAGING_DIR must point at storage shared by all Airflow workers"
+        )
+
+def extract(shard, num_shards, run_id):
+    require_staging_dir()
+    from etl import metrics
+    from etl.client import TICKETMASTER_RATE_LIMIT
+    from etl.db import task_pool
+    from etl.extract import track_current_events
+    from etl.staging import write_frames
+
+    metrics.reset()
+    try:
+        with metrics.stage('extract'), task_pool(maxconn=2):
+            # Split the key's rate limit so parallel shards together stay within it
+            events_df, event_details_df = track_current_events(
+                shard=shard,
+                num_shards=num_shards,
+                requests_per_second=TICKETMASTER_RATE_LIMIT / num_shards
+            )
+        with metrics.stage('stage_write'):
+            paths = write_frames(
+                {'events': events_df, 'event_details': event_details_df},
+                run_id=run_id,
+                shard=shard
+            )
+    finally:
+        metrics.emit('extract_task', {'shard': shard})
     return {
-        'events_df': events_df,
-        'event_details_df': event_details_df
+        'events_path': paths['events'],
+        'event_details_path': paths['event_details'],
+        'shard': shard
     }
 
-def load(ti):
-    # Get DataFrames from previous task
-    data = ti.xcom_pull(task_ids='extract_task')
-    if not data:
-        raise ValueError("No data received from extract task")
-    
-    # Load credentials using absolute path
-    env_path = '/home/kevin/concert-prices/.env'
-    load_dotenv(env_path)
-    pg_user = os.getenv('POSTGRESQL_USER')
-    pg_password = os.getenv('POSTGRESQL_PASSWORD')
-    
-    # Debug prints
-    print(f"User: {pg_user}")
-    print(f"Password: {pg_password}")
-    
-    load_to_sql(pg_user, pg_password, data['events_df'], data['event_details_df'])
-
-# Create separate tasks
-extract_task = PythonOperator(
+def load(events_path, event_details_path, shard=0):
+    require_staging_dir()
+    from etl import metrics
+    from etl.db import task_pool
+    from etl.load import load_to_sql
+    from etl.staging import read_frame
+
+    metrics.reset()
+    try:
+        with metrics.stage('stage_read'):
+            events_df = read_frame(events_path)
+            event_details_df = read_frame(event_details_path)
+        if events_df is None and event_details_df is None:
+            print("No data staged for this shard")
+            return
+
+        # Load credentials using absolute path
+        env_path = '/home/kevin/concert-prices/.env'
+        load_dotenv(env_path)
+        pg_user = os.getenv('POSTGRESQL_USER')
+        pg_password = os.getenv('POSTGRESQL_PASSWORD')
+
+        with metrics.stage('load'), task_pool(maxconn=2):
+            # Fail the task on errors so Airflow retries it and cleanup keeps the files
+            load_to_sql(pg_user, pg_password, events_df, event_details_df, raise_errors=True)
+    finally:
+        metrics.emit('load_task', {'shard': shard})
+
+def archive():
+    from etl import metrics
+    from etl.archive import export_archive
+    from etl.db import task_pool
+
+    metrics.reset()
+    try:
+        with metrics.stage('archive'), task_pool(maxconn=1):
+            export_archive()
+    finally:
+        metrics.emit('archive_task')
+
+def cleanup(run_id):
+    require_staging_dir()
+    from etl.staging import remove_run
+    remove_run(run_id)
+
+# Create separate tasks, one mapped extract/load pair per shard
+extract_task = PythonOperator.partial(
     task_id='extract_task',
     python_callable=extract,
     dag=dag
+).expand(
+    op_kwargs=[{'shard': shard, 'num_shards': NUM_SHARDS} for shard in range(NUM_SHARDS)]
 )
 
-load_task = PythonOperator(
+load_task = PythonOperator.partial(
     task_id='load_task',
     python_callable=load,
     dag=dag
+).expand(
+    op_kwargs=extract_task.output
+)
+
+archive_task = PythonOperator(
+    task_id='archive_task',
+    python_callable=archive,
+    dag=dag
+)
+
+# Only runs once every shard has loaded; after a failed load the staged files
+# are kept so the data can still be loaded by hand
+cleanup_task = PythonOperator(
+    task_id='cleanup_task',
+    python_callable=cleanup,
+    dag=dag
 )
 
 # Set task dependencies
-extract_task >> load_task
\ No newline at end of file
+extract_task >> load_task >> [archive_task, cleanup_task]
@@ -0,0 +1,79 @@
+"""
+Throwaway PostgreSQL cluster for benchmarks.
+
+Creates a fresh data directory with initdb, starts it on a free localhost
+port, and deletes everything on exit. Needs the PostgreSQL server binaries
+(initdb, pg_ctl) on PATH or in /usr/lib/postgresql/<version>/bin, and must
+not run as root.
+"""
+
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+def _find_binary(name):
+    path = shutil.which(name)
+    if path:
+        return path
+    candidates = sorted(glob.glob(f'/usr/lib/postgresql/*/bin/{name}'))
+    if candidates:
+        return candidates[-1]
+    raise RuntimeError(f"Could not find PostgreSQL binary '{name}'")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class ThrowawayPostgres:
+    """
+    Temporary PostgreSQL server. Use as a context manager; `env` holds the
+    POSTGRESQL_* settings etl.db reads.
+    """
+
+    def __init__(self, user='bench'):
+        self.user = user
+        self.port = _free_port()
+        self.directory = tempfile.mkdtemp(prefix='ticket_trail_pg_')
+        self.data_dir = os.path.join(self.directory, 'data')
+        self.log_file = os.path.join(self.directory, 'postgres.log')
+
+    @property
+    def env(self):
+        return {
+            'POSTGRESQL_HOST': '127.0.0.1',
+            'POSTGRESQL_PORT': str(self.port),
+            'POSTGRESQL_USER': self.user,
+            'POSTGRESQL_PASSWORD': ''
+        }
+
+    def start(self):
+        subprocess.run(
+            [_find_binary('initdb'), '-D', self.data_dir, '-U', self.user, '--auth=trust', '-E', 'UTF8'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        subprocess.run(
+            [
+                _find_binary('pg_ctl'), '-D', self.data_dir, '-l', self.log_file, '-w',
+                '-o', f"-p {self.port} -k {self.directory} -c listen_addresses=127.0.0.1 -c fsync=off"
+            , 'start'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        return self
+
+    def stop(self):
+        if os.path.exists(os.path.join(self.data_dir, 'postmaster.pid')):
+            subprocess.run(
+                [_find_binary('pg_ctl'), '-D', self.data_dir, '-m', 'immediate', 'stop'],
+                check=False, stdout=subprocess.DEVNULL
+            )
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,208 @@
+"""
+Offline end-to-end ETL benchmark.
+
+Runs search_event_pages, transform, load_to_sql and track_current_events
+against a stub Discovery API (benchmarks/stub_server.py) and a throwaway
+PostgreSQL cluster (benchmarks/postgres.py), then writes per-stage
+throughput, API calls, DB round trips and peak Python memory to JSON.
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+    python -m benchmarks.run --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.postgres import ThrowawayPostgres
+from benchmarks.stub_server import EVENTS_PER_ARTIST, StubDiscoveryServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def measure(stage, fn, count, stub):
+    """
+    Run one stage and collect its numbers.
+
+    Args:
+        stage (str): Stage name
+        fn (callable): Runs the stage and returns its output
+        count (callable): Maps the output to the number of events processed
+        stub (StubDiscoveryServer): Server whose request counter is sampled
+
+    Returns:
+        output, dict of metrics
+    """
+    from etl.db import round_trip_count
+
+    api_before = stub.api_calls()
+    db_before = round_trip_count()
+    tracemalloc.start()
+    started = time.perf_counter()
+    output = fn()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    events = count(output)
+    metrics = {
+        'stage': stage,
+        'events': events,
+        'seconds': round(seconds, 4),
+        'events_per_sec': round(events / seconds, 1) if seconds else None,
+        'api_calls': stub.api_calls() - api_before,
+        'db_round_trips': round_trip_count() - db_before,
+        'peak_memory_mb': round(peak / 2 ** 20, 2)
+    }
+    print(f"  {stage:<12} {events:>8} events  {seconds:8.2f}s  "
+          f"{metrics['api_calls']:>6} api calls  {metrics['db_round_trips']:>6} db round trips  "
+          f"{metrics['peak_memory_mb']:8.1f} MB")
+    return output, metrics
+
+def reset_database():
+    """
+    Drop and recreate ticket_trail_db in the throwaway cluster, then migrate it.
+    """
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+    from etl import venue_cache
+    from etl.db import DB_NAME, close_pools, connect
+    from etl.migrate import migrate
+
+    close_pools()
+    conn = connect(database='postgres')
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    cursor = conn.cursor()
+    cursor.execute(f'DROP DATABASE IF EXISTS {DB_NAME}')
+    cursor.execute(f'CREATE DATABASE {DB_NAME}')
+    conn.close()
+    # Venue ids cached from the dropped database no longer exist
+    venue_cache.clear()
+    migrate()
+
+def bench_size(size, stub, args):
+    """
+    Run every stage once for a catalogue of `size` events.
+    """
+    import pandas as pd
+    from etl import client, extract
+    from etl.load import load_to_sql
+    from etl.transform import transform
+
+    client.DISCOVERY_API_URL = f"{stub.base_url}/discovery/v2"
+    reset_database()
+
+    def search():
+        # Same rate limit as the track stage, not the shared client's default
+        search_client = client.TicketmasterClient('bench', requests_per_second=args.rps)
+        chunks = []
+        for artist in range(-(-size // EVENTS_PER_ARTIST)):
+            chunks.extend(extract.search_event_pages('bench', f'artist-{artist}', client=search_client))
+        return tuple(pd.concat(frames, ignore_index=True) for frames in zip(*chunks))
+
+    stages = []
+    frames, metrics = measure('search', search, lambda out: len(out[0]), stub)
+    stages.append(metrics)
+
+    frames, metrics = measure('transform', lambda: transform(*frames), lambda out: len(out[0]), stub)
+    stages.append(metrics)
+
+    events_df, event_details_df, venues_df = frames
+    _, metrics = measure(
+        'load_search',
+        lambda: load_to_sql(events=events_df, event_details=event_details_df, venues=venues_df),
+        lambda out: len(events_df), stub
+    )
+    stages.append(metrics)
+
+    tracked, metrics = measure(
+        'track',
+        lambda: extract.track_current_events(max_workers=args.workers, requests_per_second=args.rps),
+        lambda out: 0 if out[0] is None else len(out[0]), stub
+    )
+    stages.append(metrics)
+
+    tracked_events_df, tracked_details_df = tracked
+    _, metrics = measure(
+        'load_track',
+        lambda: load_to_sql(events=tracked_events_df, event_details=tracked_details_df),
+        lambda out: 0 if tracked_events_df is None else len(tracked_events_df), stub
+    )
+    stages.append(metrics)
+
+    return {'tracked_events': size, 'stages': stages}
+
+def run(args):
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {
+            'sizes': args.sizes,
+            'latency_ms': args.latency_ms,
+            'error_rate': args.error_rate,
+            'workers': args.workers,
+            'rps': args.rps
+        },
+        'runs': []
+    }
+
+    with ThrowawayPostgres() as pg:
+        os.environ.update(pg.env)
+        os.environ['CONSUMER_KEY'] = 'bench'
+        os.environ['TICKET_TRAIL_HTTP_CACHE'] = 'off'
+
+        for size in args.sizes:
+            print(f"\n=== {size} tracked events ===")
+            with StubDiscoveryServer(size, args.latency_ms / 1000, args.error_rate) as stub:
+                results['runs'].append(bench_size(size, stub, args))
+
+        from etl.db import close_pools
+        close_pools()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+def compare(baseline_path, candidate_path):
+    """
+    Print per-stage events/sec for two result files and the relative change.
+    """
+    def rates(path):
+        with open(path) as f:
+            data = json.load(f)
+        return {
+            (run['tracked_events'], stage['stage']): stage['events_per_sec']
+            for run in data['runs'] for stage in run['stages']
+        }
+
+    baseline, candidate = rates(baseline_path), rates(candidate_path)
+    print(f"{'size':>8} {'stage':<12} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for key in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[key], candidate[key]
+        change = f"{(after / before - 1) * 100:+.1f}%" if before and after else 'n/a'
+        print(f"{key[0]:>8} {key[1]:<12} {before or 0:>12.1f} {after or 0:>12.1f} {change:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline ETL benchmark against a stub Ticketmaster API')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Tracked event counts to benchmark')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Stub API latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of stub responses that are 429s')
+    parser.add_argument('--workers', type=int, default=8, help='max_workers for track_current_events')
+    parser.add_argument('--rps', type=float, default=1000, help='API requests per second for the search and track stages')
+    parser.add_argument('--output', help='Result file (default benchmarks/results/bench-<timestamp>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help='Compare two result files instead of running')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Local stand-in for the Ticketmaster Discovery API, serving synthetic events.
+
+Supports the calls the etl package makes:
+    GET /discovery/v2/events.json?keyword=artist-<k>&page=&size=   keyword search
+    GET /discovery/v2/events.json?id=<id>,<id>,...                 multi-id lookup
+    GET /discovery/v2/events/<id>.json                             single event
+
+Artist k owns events k * EVENTS_PER_ARTIST .. (k + 1) * EVENTS_PER_ARTIST - 1,
+which keeps every artist inside the API's 1000-result paging window.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+EVENTS_PER_ARTIST = 1000
+GENRES = ['Pop', 'Rock', 'Hip-Hop/Rap', 'Country', 'R&B', 'Alternative']
+
+def event_id(index):
+    return f"BENCH{index:07d}"
+
+def synthetic_event(index, today=None):
+    """
+    Deterministic Discovery API event payload for event number `index`.
+    """
+    today = today or date.today()
+    rng = random.Random(index)
+    start = today + timedelta(days=rng.randint(1, 365))
+    on_sale = today - timedelta(days=rng.randint(1, 60))
+    presale = on_sale - timedelta(days=rng.randint(1, 7))
+    venue = index % 5000
+    return {
+        'id': event_id(index),
+        'name': f"Artist {index // EVENTS_PER_ARTIST} Live #{index}",
+        'priceRanges': [{'min': round(rng.uniform(20, 400), 2)}],
+        'dates': {'start': {'dateTime': f"{start.isoformat()}T20:00:00Z", 'localDate': start.isoformat()}},
+        'classifications': [{'genre': {'name': GENRES[index % len(GENRES)]}}],
+        'sales': {
+            'public': {
+                'startDateTime': f"{on_sale.isoformat()}T15:00:00Z",
+                'endDateTime': f"{start.isoformat()}T20:00:00Z"
+            },
+            'presales': [{
+                'startDateTime': f"{presale.isoformat()}T15:00:00Z",
+                'endDateTime': f"{on_sale.isoformat()}T03:00:00Z"
+            }]
+        },
+        '_embedded': {'venues': [{
+            'id': f"BENCHV{venue:05d}",
+            'name': f"Venue {venue}",
+            'city': {'name': f"City {venue % 300}"},
+            'state': {'stateCode': 'CA'}
+        }]}
+    }
+
+class StubDiscoveryServer:
+    """
+    Threaded HTTP server serving `num_events` synthetic events.
+
+    Args:
+        num_events (int): Size of the synthetic catalogue
+        latency (float): Seconds to sleep before answering each request
+        error_rate (float): Fraction of requests answered with 429 Too Many Requests
+        seed (int): Seed for the 429 injection
+    """
+
+    def __init__(self, num_events, latency=0.0, error_rate=0.0, seed=0):
+        self.num_events = num_events
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def api_calls(self):
+        """
+        Total requests served so far, including injected 429s.
+        """
+        with self._lock:
+            return sum(self.calls.values())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _record(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload=None, headers=None):
+                body = json.dumps(payload or {}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+                single = re.fullmatch(r'/discovery/v2/events/([^/]+)\.json', parsed.path)
+                endpoint = 'event' if single else 'events'
+                stub._record(endpoint)
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub._should_fail():
+                    self._send(429, {'fault': 'rate limit'}, {'Retry-After': '1'})
+                    return
+
+                if single:
+                    index = stub._index(single.group(1))
+                    if index is None:
+                        self._send(404, {'errors': [{'detail': 'not found'}]})
+                    else:
+                        self._send(200, synthetic_event(index))
+                elif parsed.path == '/discovery/v2/events.json':
+                    self._send(200, stub._search(query))
+                else:
+                    self._send(404)
+
+        return Handler
+
+    def _index(self, eid):
+        match = re.fullmatch(r'BENCH(\d{7})', eid)
+        if match is None or int(match.group(1)) >= self.num_events:
+            return None
+        return int(match.group(1))
+
+    def _search(self, query):
+        size = int(query.get('size', 20))
+        page = int(query.get('page', 0))
+
+        if 'id' in query:
+            indexes = [self._index(eid) for eid in query['id'].split(',')]
+            indexes = [i for i in indexes if i is not None]
+        else:
+            match = re.fullmatch(r'artist-(\d+)', query.get('keyword', ''))
+            if match is None:
+                return {'page': {'size': size, 'number': page, 'totalElements': 0, 'totalPages': 0}}
+            first = int(match.group(1)) * EVENTS_PER_ARTIST
+            indexes = list(range(first, min(first + EVENTS_PER_ARTIST, self.num_events)))
+
+        total = len(indexes)
+        page_indexes = indexes[page * size:(page + 1) * size]
+        payload = {'page': {
+            'size': size,
+            'number': page,
+            'totalElements': total,
+            'totalPages': -(-total // size) if size else 0
+        }}
+        if page_indexes:
+            payload['_embedded'] = {'events': [synthetic_event(i) for i in page_indexes]}
+        return payload
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the stub Discovery API until interrupted')
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    server = StubDiscoveryServer(args.events, args.latency_ms / 1000, args.error_rate).start()
+    print(f"Serving {args.events} events at {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
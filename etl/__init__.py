@@ -0,0 +1,47 @@
+"""
+Ticket Trail ETL.
+
+Importing the package is free of side effects and cheap: the public helpers
+below are loaded from their modules (and pandas/psycopg2 with them) only when
+first accessed, e.g. `etl.load_to_sql`. search_event, transform and migrate
+are left out: those names are the etl.search_event, etl.transform and
+etl.migrate submodules, which shadow any package attribute once imported.
+Import the functions from etl.extract, etl.transform and etl.migrate instead.
+Run `python -m etl --help` for the CLI.
+"""
+
+import importlib
+
+_LAZY_ATTRS = {
+    'search_event_pages': 'etl.extract',
+    'track_current_events': 'etl.extract',
+    'iter_tracked_events': 'etl.extract',
+    'load_to_sql': 'etl.load',
+    'get_connection': 'etl.db',
+    'close_pools': 'etl.db',
+    'create_database': 'etl.create_db',
+    'get_client': 'etl.client',
+    'run_pipeline': 'etl.pipeline',
+    'onboard_file': 'etl.onboard',
+    'export_archive': 'etl.archive',
+    'read_prices': 'etl.archive',
+    'score_events': 'etl.analytics',
+    'get_price_series': 'etl.series',
+    'search_events': 'etl.search_index',
+    'get_price_history': 'etl.price_history',
+    'get_price_summary': 'etl.price_history',
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'etl' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,166 @@
+"""
+Command line entry point: python -m etl {search,track,venue,onboard,archive,init-db}
+
+Each subcommand imports only the modules it needs, inside its handler, so
+`python -m etl --help` starts without loading pandas or psycopg2.
+"""
+
+import argparse
+import os
+import sys
+
+def _api_key():
+    from dotenv import load_dotenv
+    load_dotenv()
+    return os.getenv('CONSUMER_KEY')
+
+def cmd_search(args):
+    if args.no_load:
+        from etl.search_event import find_events, print_events
+        events = find_events(_api_key(), args.keyword, size=args.size, city=args.city)
+        if events is None:
+            return 1
+        print_events(events)
+        return 0
+
+    from etl.extract import search_event
+    from etl.transform import transform
+    from etl.load import load_to_sql
+
+    events_df, event_details_df, venues_df = search_event(
+        key=_api_key(), keyword=args.keyword, city=args.city, size=args.size
+    )
+    if events_df is None:
+        print("No events found!")
+        return 1
+    events_df, event_details_df, venues_df = transform(events_df, event_details_df, venues_df)
+    load_to_sql(events=events_df, event_details=event_details_df, venues=venues_df, raise_errors=True)
+    print(f"Loaded {len(event_details_df)} events for '{args.keyword}'")
+    return 0
+
+def cmd_track(args):
+    from etl.extract import iter_tracked_events
+    from etl.load import load_to_sql
+
+    # iter_tracked_events raises on failure (track_current_events only prints),
+    # so a failed run exits non-zero for cron / CI
+    try:
+        refreshed = 0
+        for events_df, event_details_df in iter_tracked_events(
+            max_workers=args.max_workers,
+            shard=args.shard,
+            num_shards=args.num_shards,
+            due_only=not args.all
+        ):
+            load_to_sql(events=events_df, event_details=event_details_df, raise_errors=True)
+            refreshed += len(events_df)
+    except Exception as e:
+        print(f"Tracking failed: {str(e)}")
+        return 1
+
+    print(f"Refreshed {refreshed} prices")
+    return 0
+
+def cmd_venue(args):
+    if args.search:
+        from etl.search_venue import search_venues
+        for venue in search_venues(_api_key(), args.search):
+            print(f"{venue['id']}: {venue['name']}")
+        return 0
+
+    if not args.venue_ids:
+        print("Give one or more venue ids, or --search NAME")
+        return 2
+
+    from etl.get_venue_details import get_new_venue_details, get_venue_details
+    api_key = _api_key()
+    if args.new_only:
+        venues = get_new_venue_details(api_key, args.venue_ids)
+    else:
+        venues = [v for v in (get_venue_details(api_key, v) for v in args.venue_ids) if v is not None]
+    for venue in venues:
+        print(f"{venue['id']}: {venue['venue_name']}, {venue['city']}, {venue['state']}")
+    return 0
+
+def cmd_onboard(args):
+    from etl.onboard import onboard_file
+    stats = onboard_file(
+        _api_key(), args.keyword_file,
+        max_workers=args.workers,
+        max_pages=args.max_pages,
+        load=not args.no_load
+    )
+    return 1 if stats is None else 0
+
+def cmd_archive(args):
+    from etl.archive import export_archive
+    export_archive(root=args.directory)
+    return 0
+
+def cmd_init_db(args):
+    from etl.create_db import create_database
+    create_database()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m etl', description='Ticket Trail ETL')
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help='Write cProfile and allocation reports for each stage')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Emit run metrics (JSON log line, Prometheus textfile) on exit')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search = subparsers.add_parser('search', help='Search Ticketmaster and load the results')
+    search.add_argument('keyword')
+    search.add_argument('--city')
+    search.add_argument('--size', type=int, default=1, help='Number of events to fetch')
+    search.add_argument('--no-load', action='store_true', help='Only print the matches')
+    search.set_defaults(func=cmd_search)
+
+    track = subparsers.add_parser('track', help='Refresh prices for tracked events that are due')
+    track.add_argument('--max-workers', type=int, default=8)
+    track.add_argument('--shard', type=int, default=0)
+    track.add_argument('--num-shards', type=int, default=1)
+    track.add_argument('--all', action='store_true', help='Ignore next_poll_at and check every tracked event')
+    track.set_defaults(func=cmd_track)
+
+    venue = subparsers.add_parser('venue', help='Look up venues by id or name')
+    venue.add_argument('venue_ids', nargs='*')
+    venue.add_argument('--search', metavar='NAME', help='Search venues by name instead')
+    venue.add_argument('--new-only', action='store_true', help='Skip venues already stored')
+    venue.set_defaults(func=cmd_venue)
+
+    onboard = subparsers.add_parser('onboard', help='Search and load every artist in a keyword file')
+    onboard.add_argument('keyword_file', help='One "keyword[,city]" per line')
+    onboard.add_argument('--workers', type=int, default=8, help='Searches run in parallel')
+    onboard.add_argument('--max-pages', type=int, help='Result pages fetched per search')
+    onboard.add_argument('--no-load', action='store_true', help='Only report what would be loaded')
+    onboard.set_defaults(func=cmd_onboard)
+
+    archive = subparsers.add_parser('archive', help='Append new daily prices and snapshots to the Parquet archive')
+    archive.add_argument('--directory', help='Archive root, defaults to TICKET_TRAIL_ARCHIVE_DIR or ./archive')
+    archive.set_defaults(func=cmd_archive)
+
+    init_db = subparsers.add_parser('init-db', help='Create the database and apply migrations')
+    init_db.set_defaults(func=cmd_init_db)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.profile is not None:
+        from etl import profiling
+        profiling.enable(directory=args.profile or None)
+
+    try:
+        return args.func(args)
+    finally:
+        if args.metrics:
+            from etl import metrics
+            metrics.emit(args.command.replace('-', '_'))
+        if 'etl.db' in sys.modules:
+            sys.modules['etl.db'].close_pools()
+
+if __name__ == "__main__":
+    sys.exit(main())
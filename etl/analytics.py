@@ -0,0 +1,200 @@
+"""
+"Good time to buy" signals computed in bulk over price histories.
+
+Histories for every requested event come back in one query against the
+event_price_daily rollup (kept current by load_to_sql in either storage mode)
+and are scored with vectorised NumPy over the concatenated arrays, using the
+event boundaries with ufunc.reduceat instead of a Python loop per event.
+
+Results are cached per event. load_to_sql invalidates an event's entry when it
+commits a new price for it; entries also expire after CACHE_TTL_SECONDS so
+loads from other processes (e.g. Airflow workers) are picked up.
+"""
+
+from datetime import date
+import numpy as np
+import pandas as pd
+from etl.db import get_connection
+from etl.lru import GenerationCache
+
+DEFAULT_WINDOW_DAYS = 7
+CACHE_TTL_SECONDS = 3600
+
+# Days until the event: <0 is past, then [0, 7), [7, 14), ... [90, inf)
+DAYS_TO_EVENT_EDGES = np.array([0, 7, 14, 30, 60, 90])
+DAYS_TO_EVENT_LABELS = np.array(['past', '0-6', '7-13', '14-29', '30-59', '60-89', '90+'], dtype=object)
+
+SIGNAL_COLUMNS = [
+    'event_id', 'observations', 'first_seen', 'last_seen',
+    'first_price', 'current_price', 'all_time_low', 'rolling_min',
+    'pct_change_from_first', 'current_percentile', 'is_all_time_low',
+    'days_to_event', 'days_to_event_bucket'
+]
+
+# Keyed by (event_id, today, window_days)
+_cache = GenerationCache(max_size=100000, ttl=CACHE_TTL_SECONDS)
+invalidate = _cache.invalidate
+
+def load_histories(event_ids, conn=None):
+    """
+    Daily price histories for many events in one query.
+
+    Args:
+        event_ids (iterable): Ticketmaster event ids
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        dict: Arrays sorted by event then day: 'event_id' (object), 'day'
+            (datetime64[D]), 'price' (float64, NaN where unknown) and
+            'event_date' (datetime64[D] per row, NaT where unknown)
+    """
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT p.event_id, p.day, p.min_price, d.event_start_date
+                FROM event_price_daily p
+                LEFT JOIN event_details d ON d.event_id = p.event_id
+                WHERE p.event_id = ANY(%s)
+                ORDER BY p.event_id, p.day
+            """, (list(event_ids),))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    if not rows:
+        return {
+            'event_id': np.array([], dtype=object),
+            'day': np.array([], dtype='datetime64[D]'),
+            'price': np.array([], dtype=np.float64),
+            'event_date': np.array([], dtype='datetime64[D]')
+        }
+
+    ids, days, prices, event_dates = zip(*rows)
+    return {
+        'event_id': np.array(ids, dtype=object),
+        'day': np.array(days, dtype='datetime64[D]'),
+        'price': np.array([np.nan if p is None else p for p in prices], dtype=np.float64),
+        'event_date': np.array(
+            [np.datetime64('NaT') if d is None else d for d in event_dates], dtype='datetime64[D]'
+        )
+    }
+
+def compute_signals(histories, window_days=DEFAULT_WINDOW_DAYS, today=None):
+    """
+    Score every event in `histories` (as returned by load_histories).
+
+    Args:
+        histories (dict): Concatenated, sorted history arrays
+        window_days (int): Days covered by rolling_min, ending at the latest price
+        today (date): Reference date for days_to_event
+
+    Returns:
+        DataFrame: One row per event with SIGNAL_COLUMNS
+    """
+    ids = histories['event_id']
+    prices = histories['price']
+    n = len(prices)
+    if n == 0:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+    day_ord = histories['day'].astype(np.int64)
+    boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [n]))
+    counts = ends - starts
+    num_events = len(starts)
+
+    first_price = prices[starts]
+    current_price = prices[ends - 1]
+    all_time_low = np.fmin.reduceat(prices, starts)
+
+    # Rolling window start per event: first row on or after last_day - window + 1.
+    # Events are laid out `span` apart on one axis so a single searchsorted finds them all.
+    base = day_ord.min()
+    span = day_ord.max() - base + window_days + 1
+    group = np.repeat(np.arange(num_events), counts)
+    composite = group * span + (day_ord - base)
+    targets = np.arange(num_events) * span + (day_ord[ends - 1] - base - window_days + 1)
+    window_starts = np.searchsorted(composite, targets, side='left')
+
+    # reduceat over (window_start, end) pairs; the NaN pad keeps `end == n` a valid index
+    pairs = np.empty(2 * num_events, dtype=np.int64)
+    pairs[0::2] = window_starts
+    pairs[1::2] = ends
+    rolling_min = np.fmin.reduceat(np.append(prices, np.nan), pairs)[0::2]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.where(first_price > 0, (current_price - first_price) / first_price * 100, np.nan)
+
+        # Share of the event's known prices at or below the current one
+        known = ~np.isnan(prices)
+        at_or_below = known & (prices <= np.repeat(current_price, counts))
+        percentile = (
+            np.add.reduceat(at_or_below.astype(np.int64), starts)
+            / np.add.reduceat(known.astype(np.int64), starts) * 100
+        )
+
+    today = np.datetime64(today or date.today(), 'D')
+    event_dates = histories['event_date'][starts]
+    days_to_event = (event_dates - today).astype('timedelta64[D]').astype(np.float64)
+    days_to_event[np.isnat(event_dates)] = np.nan
+    buckets = DAYS_TO_EVENT_LABELS[np.digitize(np.nan_to_num(days_to_event, nan=-1), DAYS_TO_EVENT_EDGES)]
+    buckets[np.isnan(days_to_event)] = 'unknown'
+
+    return pd.DataFrame({
+        'event_id': ids[starts],
+        'observations': counts,
+        'first_seen': histories['day'][starts],
+        'last_seen': histories['day'][ends - 1],
+        'first_price': first_price,
+        'current_price': current_price,
+        'all_time_low': all_time_low,
+        'rolling_min': rolling_min,
+        'pct_change_from_first': pct_change,
+        'current_percentile': percentile,
+        'is_all_time_low': current_price <= all_time_low,
+        'days_to_event': days_to_event,
+        'days_to_event_bucket': buckets
+    }, columns=SIGNAL_COLUMNS)
+
+def _empty_row(event_id):
+    return (event_id, 0, pd.NaT, pd.NaT) + (np.nan,) * 6 + (False, np.nan, 'unknown')
+
+def score_events(event_ids, window_days=DEFAULT_WINDOW_DAYS, conn=None, today=None, refresh=False):
+    """
+    Buy signals for many events, served from the cache where possible.
+
+    Args:
+        event_ids (iterable): Ticketmaster event ids
+        window_days (int): Days covered by rolling_min
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+        today (date): Reference date for days_to_event, defaults to today
+        refresh (bool): Ignore cached results
+
+    Returns:
+        DataFrame: One row per requested event with SIGNAL_COLUMNS; events with
+            no price history have NaN signals
+    """
+    today = today or date.today()
+    event_ids = list(dict.fromkeys(event_ids))
+
+    rows = {}
+    misses = []
+    for event_id in event_ids:
+        cached = None if refresh else _cache.get((event_id, today, window_days))
+        if cached is not None:
+            rows[event_id] = cached
+        else:
+            misses.append(event_id)
+
+    if misses:
+        generation = _cache.generation
+        computed = compute_signals(load_histories(misses, conn), window_days, today)
+        found = {row[0]: row for row in computed.itertuples(index=False, name=None)}
+        for event_id in misses:
+            row = found.get(event_id) or _empty_row(event_id)
+            rows[event_id] = row
+            _cache.put((event_id, today, window_days), row, generation)
+
+    return pd.DataFrame([rows[event_id] for event_id in event_ids], columns=SIGNAL_COLUMNS)
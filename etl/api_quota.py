@@ -0,0 +1,45 @@
+"""
+Daily Ticketmaster call counts shared by every process using an API key.
+
+TicketmasterClient reserves calls here in blocks, so hourly Airflow runs,
+parallel shards and CLI runs all count against the same per-UTC-day total
+instead of each starting from zero. Keys are stored as a short hash.
+"""
+
+import hashlib
+from etl.db import get_connection
+
+def key_id(api_key):
+    """
+    Short, non-reversible id for an API key.
+    """
+    return hashlib.sha256((api_key or '').encode()).hexdigest()[:16]
+
+def reserve_calls(api_key, day, calls, conn=None):
+    """
+    Add `calls` to the key's count for `day`.
+
+    Args:
+        api_key (str): Ticketmaster API key
+        day (date): UTC day the calls count against
+        calls (int): Calls to reserve
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        int: Calls counted for the key on `day`, including these
+    """
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO api_quota_usage (key_id, day, calls)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (key_id, day)
+                DO UPDATE SET calls = api_quota_usage.calls + EXCLUDED.calls
+                RETURNING calls
+            """, (key_id(api_key), day, calls))
+            total = cursor.fetchone()[0]
+            conn.commit()
+        finally:
+            cursor.close()
+    return total
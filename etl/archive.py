@@ -0,0 +1,180 @@
+"""
+Incremental Parquet archive of price history, for analytics off the database.
+
+Layout under TICKET_TRAIL_ARCHIVE_DIR (default ./archive):
+
+    prices/month=YYYY-MM/genre=<genre>/<YYYY-MM-DD>-0.parquet
+    event_details/snapshot_date=YYYY-MM-DD/part-0.parquet
+    venues/snapshot_date=YYYY-MM-DD/part-0.parquet
+    event_venues/snapshot_date=YYYY-MM-DD/part-0.parquet
+    _export_state.json
+
+Each export appends the daily prices (each event's lowest price on every day
+it was scraped, from the event_price_daily rollup that both storage modes keep)
+for completed days after the high-water mark in _export_state.json, so it costs
+O(new rows). Today is never exported because its prices can still change.
+Only days an event was actually scraped are exported: in intervals mode the
+events_daily view also covers the days between scrapes, and a later load can
+extend an interval over days the mark has already passed.
+Files are named by day, so an export that dies before saving the high-water
+mark is simply redone without duplicates.
+Table snapshots are taken at most once a day (last_snapshot in the state file).
+Read the dataset with read_prices() or any Arrow/Parquet reader using hive
+partitioning.
+"""
+
+from datetime import date, timedelta
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from etl.db import get_connection
+from etl.migrate import month_start, next_month
+
+STATE_FILE = '_export_state.json'
+
+# Scraped days in (after, before)
+NEW_PRICES_SQL = """
+    SELECT p.event_id, p.min_price AS min_ticket_price, p.day AS date_scraped,
+        COALESCE(NULLIF(d.genre, ''), 'unknown') AS genre
+    FROM event_price_daily p
+    LEFT JOIN event_details d ON d.event_id = p.event_id
+    WHERE p.day > %(after)s AND p.day < %(before)s
+"""
+
+SNAPSHOT_TABLES = {
+    'event_details': "SELECT * FROM event_details",
+    'venues': "SELECT * FROM venues",
+    'event_venues': "SELECT * FROM event_venues",
+}
+
+def archive_dir(root=None):
+    return root or os.getenv('TICKET_TRAIL_ARCHIVE_DIR', 'archive')
+
+def read_state(root=None):
+    path = os.path.join(archive_dir(root), STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_state(state, root=None):
+    root = archive_dir(root)
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, STATE_FILE)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+def _first_price_date(cursor):
+    cursor.execute("SELECT min(day) FROM event_price_daily")
+    return cursor.fetchone()[0]
+
+def _write_prices(df, root):
+    df['month'] = pd.to_datetime(df['date_scraped']).dt.strftime('%Y-%m')
+    for day, day_df in df.groupby('date_scraped'):
+        table = pa.Table.from_pandas(day_df, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=os.path.join(root, 'prices'),
+            partition_cols=['month', 'genre'],
+            basename_template=f'{day}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore'
+        )
+
+def _write_snapshot(df, root, name, snapshot_date):
+    directory = os.path.join(root, name, f'snapshot_date={snapshot_date}')
+    os.makedirs(directory, exist_ok=True)
+    df.to_parquet(os.path.join(directory, 'part-0.parquet'), index=False)
+
+def export_archive(root=None, conn=None, today=None):
+    """
+    Append new completed days of prices to the archive, plus today's table
+    snapshots if they haven't been taken yet.
+
+    Args:
+        root (str): Archive directory, defaults to TICKET_TRAIL_ARCHIVE_DIR or ./archive
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+        today (date): Override the current date (days before it are complete)
+
+    Returns:
+        dict: Rows exported and the new high-water mark, or None if another
+            export holds the lock
+    """
+    root = archive_dir(root)
+    today = today or date.today()
+    state = read_state(root)
+    high_water = date.fromisoformat(state['prices_through']) if state.get('prices_through') else None
+
+    exported = 0
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            # One export at a time, it owns the state file
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext('ticket_trail_archive'))")
+            if not cursor.fetchone()[0]:
+                print("Another archive export is running, skipping")
+                return None
+
+            try:
+                if high_water is None:
+                    first = _first_price_date(cursor)
+                    high_water = first - timedelta(days=1) if first else today - timedelta(days=1)
+
+                # A month at a time keeps the first (full history) export bounded in memory
+                start = high_water + timedelta(days=1)
+                while start < today:
+                    end = min(next_month(month_start(start)), today)
+                    prices = pd.read_sql(
+                        NEW_PRICES_SQL, con=conn,
+                        params={'after': start - timedelta(days=1), 'before': end}
+                    )
+                    if not prices.empty:
+                        _write_prices(prices, root)
+                        exported += len(prices)
+                    high_water = end - timedelta(days=1)
+                    state['prices_through'] = high_water.isoformat()
+                    write_state(state, root)
+                    start = end
+
+                # The DAG runs hourly; the tables are only snapshotted once a day
+                if state.get('last_snapshot') != today.isoformat():
+                    for name, sql in SNAPSHOT_TABLES.items():
+                        _write_snapshot(pd.read_sql(sql, con=conn), root, name, today)
+                    state['last_snapshot'] = today.isoformat()
+                    write_state(state, root)
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext('ticket_trail_archive'))")
+                conn.commit()
+        finally:
+            cursor.close()
+
+    print(f"Archived {exported} daily prices through {high_water}")
+    return {'rows': exported, 'prices_through': high_water}
+
+def read_prices(root=None, columns=None, filters=None):
+    """
+    Read archived daily prices into a DataFrame, memory-mapping the files.
+
+    Args:
+        root (str): Archive directory, defaults to TICKET_TRAIL_ARCHIVE_DIR or ./archive
+        columns (list): Columns to read, all if None
+        filters: pyarrow filter expression or DNF list, e.g.
+            [('month', '>=', '2025-01'), ('genre', '=', 'Pop')] to prune partitions
+
+    Returns:
+        DataFrame: event_id, min_ticket_price, date_scraped, genre, month
+    """
+    dataset = ds.dataset(
+        os.path.join(archive_dir(root), 'prices'),
+        format='parquet',
+        partitioning='hive',
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+    if isinstance(filters, list):
+        filters = pq.filters_to_expression(filters)
+    return dataset.to_table(columns=columns, filter=filters).to_pandas()
@@ -0,0 +1,230 @@
+"""
+Shared Ticketmaster Discovery API client.
+
+One keep-alive requests.Session per client, a token bucket for the per-second
+limit, retries with exponential backoff and full jitter on 429 / 5xx /
+connection errors (honouring Retry-After), and daily quota accounting that
+stops before the key is exhausted. Calls are counted per UTC day in the
+database (etl.api_quota), reserved QUOTA_BLOCK_SIZE at a time, so every run
+and process using the key draws on the same daily total. Responses go through
+the on-disk cache in etl.http_cache, and cache hits don't count against the quota.
+"""
+
+from datetime import datetime, timezone
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from etl import api_quota, metrics
+from etl.http_cache import get_cache
+from etl.rate_limit import TokenBucket
+
+# Base URL can be pointed at a stub server (see benchmarks/)
+DISCOVERY_API_URL = os.getenv('TICKETMASTER_API_BASE', 'https://app.ticketmaster.com') + '/discovery/v2'
+# Discovery API allows 5 requests per second and 5000 per day per key
+TICKETMASTER_RATE_LIMIT = 5
+TICKETMASTER_DAILY_QUOTA = 5000
+# Calls reserved from the shared daily count per database round trip
+QUOTA_BLOCK_SIZE = 20
+
+class QuotaExhausted(Exception):
+    """
+    Raised instead of making a call that would eat into the reserved daily quota.
+    """
+
+class _NetworkSession:
+    # What the response cache calls on a miss: a retried, rate-limited request
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.client._send(url, params=params, headers=headers, timeout=timeout)
+
+class TicketmasterClient:
+    """
+    Thread-safe Discovery API client.
+
+    Args:
+        api_key (str): Ticketmaster API key, defaults to CONSUMER_KEY
+        requests_per_second (float): Per-second request limit shared by all threads
+        daily_quota (int): Calls allowed per UTC day
+        quota_reserve (int): Calls left untouched so the key is never fully exhausted
+        persist_quota (bool): Count calls in the database, shared with every other
+            run and process using the key; if False (or the database can't be
+            reached) only this client's own calls are counted
+        max_retries (int): Retries after the first attempt
+        backoff_base (float): First backoff step in seconds
+        backoff_cap (float): Longest single backoff in seconds
+        pool_size (int): Keep-alive connections kept open
+        timeout (float): Per-request timeout in seconds
+        use_cache (bool): Go through the on-disk response cache
+    """
+
+    def __init__(self, api_key=None, requests_per_second=TICKETMASTER_RATE_LIMIT,
+                 daily_quota=TICKETMASTER_DAILY_QUOTA, quota_reserve=50, max_retries=4,
+                 backoff_base=0.5, backoff_cap=30.0, pool_size=16, timeout=10, use_cache=True,
+                 persist_quota=True):
+        if api_key is None:
+            load_dotenv()
+            api_key = os.getenv('CONSUMER_KEY')
+        self.api_key = api_key
+        self.daily_quota = daily_quota
+        self.quota_reserve = quota_reserve
+        self.persist_quota = persist_quota
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self.rate_limiter = TokenBucket(requests_per_second)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._quota_day = None
+        # Calls counted today, including the unused part of our reserved block
+        self._calls_today = 0
+        self._reserved = 0
+        self._available = None
+        self.quota_exhausted = False
+
+    def url(self, path):
+        """
+        Full URL for a Discovery API path such as '/events.json'.
+        """
+        if path.startswith('http'):
+            return path
+        return f"{DISCOVERY_API_URL}{path}"
+
+    def get(self, path, params=None):
+        """
+        GET a Discovery API path (or full URL) with the API key added.
+
+        Returns:
+            Response (or etl.http_cache.CachedResponse) after retries; check status_code
+
+        Raises:
+            QuotaExhausted: The call would dip into the reserved daily quota
+        """
+        params = dict(params or {})
+        params.setdefault('apikey', self.api_key)
+        url = self.url(path)
+
+        cache = get_cache() if self.use_cache else None
+        if cache is None:
+            return self._send(url, params=params, timeout=self.timeout)
+        return cache.get(url, params=params, timeout=self.timeout, session=_NetworkSession(self))
+
+    def calls_remaining(self):
+        """
+        Calls left today: the server's Rate-Limit-Available if seen, else the local count.
+        """
+        with self._lock:
+            self._roll_quota_day()
+            local = self.daily_quota - self._calls_today + self._reserved
+            return local if self._available is None else min(local, self._available)
+
+    def _roll_quota_day(self):
+        today = datetime.now(timezone.utc).date()
+        if self._quota_day != today:
+            self._quota_day = today
+            self._calls_today = 0
+            self._reserved = 0
+            self._available = None
+            self.quota_exhausted = False
+
+    def _reserve_block(self):
+        # Take the next block of calls; the shared count then includes all of it
+        if self.persist_quota:
+            try:
+                self._calls_today = api_quota.reserve_calls(self.api_key, self._quota_day, QUOTA_BLOCK_SIZE)
+                self._reserved = QUOTA_BLOCK_SIZE
+                return
+            except Exception as e:
+                print(f"Couldn't update the shared API call count, counting locally: {str(e)}")
+                self.persist_quota = False
+        self._calls_today += QUOTA_BLOCK_SIZE
+        self._reserved = QUOTA_BLOCK_SIZE
+
+    def _reserve_call(self):
+        with self._lock:
+            self._roll_quota_day()
+            if self._reserved == 0 and not self.quota_exhausted:
+                self._reserve_block()
+            remaining = self.daily_quota - self._calls_today + self._reserved
+            if self._available is not None:
+                remaining = min(remaining, self._available)
+            if self.quota_exhausted or remaining <= self.quota_reserve:
+                self.quota_exhausted = True
+                raise QuotaExhausted(
+                    f"Stopping with {remaining} calls left today (reserve is {self.quota_reserve})"
+                )
+            self._reserved -= 1
+
+    def _record_quota(self, response):
+        available = response.headers.get('Rate-Limit-Available')
+        if available is not None and available.isdigit():
+            with self._lock:
+                self._available = int(available)
+
+    def _backoff(self, attempt, response=None):
+        # Honour Retry-After when the server sends it, else full jitter
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _send(self, url, params=None, headers=None, timeout=None):
+        for attempt in range(self.max_retries + 1):
+            self._reserve_call()
+            self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.record_api_call(url, time.perf_counter() - start, 'error')
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            metrics.record_api_call(url, time.perf_counter() - start, response.status_code)
+            self._record_quota(response)
+
+            if response.status_code == 429 and response.headers.get('Rate-Limit-Available') == '0':
+                # The daily quota is gone, waiting won't help
+                with self._lock:
+                    self.quota_exhausted = True
+                raise QuotaExhausted("Ticketmaster daily quota exhausted")
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    return response
+                time.sleep(self._backoff(attempt, response))
+                continue
+
+            return response
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(api_key=None):
+    """
+    Process-wide client for an API key, so every caller shares its session and quota.
+    """
+    if api_key is None:
+        load_dotenv()
+        api_key = os.getenv('CONSUMER_KEY')
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = TicketmasterClient(api_key)
+            _clients[api_key] = client
+    return client
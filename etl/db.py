@@ -0,0 +1,149 @@
+from dotenv import load_dotenv
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, cursor as base_cursor
+from contextlib import contextmanager
+import os
+import threading
+
+DB_NAME = 'ticket_trail_db'
+DEFAULT_POOL_SIZE = 5
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+_round_trips = 0
+_round_trips_lock = threading.Lock()
+
+def _count_round_trip(n=1):
+    global _round_trips
+    with _round_trips_lock:
+        _round_trips += n
+
+def round_trip_count():
+    """
+    Number of statements sent to PostgreSQL by this process so far.
+    """
+    return _round_trips
+
+class CountingCursor(base_cursor):
+    """
+    Cursor that counts every statement it sends to the server.
+    """
+
+    def execute(self, query, vars=None):
+        _count_round_trip()
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        # psycopg2 sends one statement per parameter set
+        vars_list = list(vars_list)
+        _count_round_trip(len(vars_list))
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        _count_round_trip()
+        return super().copy_expert(sql, file, size)
+
+def connection_params(user=None, password=None, database=DB_NAME):
+    """
+    Build psycopg2 connection arguments from the environment.
+
+    Args:
+        user (str): PostgreSQL username, defaults to POSTGRESQL_USER
+        password (str): PostgreSQL password, defaults to POSTGRESQL_PASSWORD
+        database (str): Database to connect to
+
+    Returns:
+        dict: Keyword arguments for psycopg2.connect
+    """
+    load_dotenv()
+    return {
+        'host': os.getenv('POSTGRESQL_HOST'),
+        'port': os.getenv('POSTGRESQL_PORT', '5432'),
+        'user': user or os.getenv('POSTGRESQL_USER'),
+        'password': password or os.getenv('POSTGRESQL_PASSWORD'),
+        'database': database,
+        'cursor_factory': CountingCursor
+    }
+
+def connect(user=None, password=None, database=DB_NAME):
+    """
+    Open a standalone, unpooled connection. The caller is responsible for closing it.
+    """
+    return psycopg2.connect(**connection_params(user, password, database))
+
+def get_pool(user=None, password=None, database=DB_NAME, minconn=1, maxconn=None):
+    """
+    Get the shared connection pool for these credentials, creating it on first use.
+
+    Args:
+        user (str): PostgreSQL username
+        password (str): PostgreSQL password
+        database (str): Database to connect to
+        minconn (int): Connections opened up front
+        maxconn (int): Upper bound on open connections, defaults to POSTGRESQL_POOL_SIZE
+
+    Returns:
+        ThreadedConnectionPool: Pool shared by every caller in this process
+    """
+    params = connection_params(user, password, database)
+    key = (params['host'], params['port'], params['user'], params['database'])
+
+    with _pools_lock:
+        db_pool = _pools.get(key)
+        if db_pool is None or db_pool.closed:
+            if maxconn is None:
+                maxconn = int(os.getenv('POSTGRESQL_POOL_SIZE', DEFAULT_POOL_SIZE))
+            db_pool = pool.ThreadedConnectionPool(minconn, max(minconn, maxconn), **params)
+            _pools[key] = db_pool
+    return db_pool
+
+@contextmanager
+def get_connection(conn=None, user=None, password=None, database=DB_NAME):
+    """
+    Borrow a pooled connection for the duration of a with block.
+
+    If `conn` is given it is used as-is and left open, so callers can share one
+    connection across extract and load. Otherwise a connection is taken from the
+    pool, rolled back if the block left a transaction open, and returned.
+
+    Args:
+        conn: Existing psycopg2 connection to reuse
+        user (str): PostgreSQL username
+        password (str): PostgreSQL password
+        database (str): Database to connect to
+    """
+    if conn is not None:
+        yield conn
+        return
+
+    db_pool = get_pool(user, password, database)
+    conn = db_pool.getconn()
+    try:
+        yield conn
+    finally:
+        if not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+def close_pools():
+    """
+    Close every pooled connection opened by this process.
+    """
+    with _pools_lock:
+        for db_pool in _pools.values():
+            db_pool.closeall()
+        _pools.clear()
+
+@contextmanager
+def task_pool(minconn=1, maxconn=None):
+    """
+    Scope a connection pool to one unit of work, such as an Airflow task.
+    All pooled connections are closed when the block exits.
+    """
+    try:
+        get_pool(minconn=minconn, maxconn=maxconn)
+        yield
+    finally:
+        close_pools()
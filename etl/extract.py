@@ -1,29 +1,130 @@
 import pandas as pd
 from dotenv import load_dotenv
 import os
-import requests
 import json
 from datetime import datetime
-import psycopg2
-from sqlalchemy import create_engine
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from etl.client import (
+    TICKETMASTER_DAILY_QUOTA, TICKETMASTER_RATE_LIMIT, QuotaExhausted, TicketmasterClient, get_client
+)
+from etl.db import get_connection
+from etl.profiling import profiled
+from etl.scheduler import compute_next_poll, compute_retry_poll, load_volatility
 
-def search_event(key: str, keyword: str, city: Optional[str] = None):
+# Columns of the events rows built by fetch_event_price / fetch_event_prices_batch
+PRICE_COLUMNS = ['id', 'min_ticket_price', 'date_scraped']
+# Event ids sent per events.json call when refreshing prices in batches
+EVENT_BATCH_SIZE = 50
+# Discovery API paging limits: at most 200 results per page and size * page < 1000
+MAX_PAGE_SIZE = 200
+MAX_PAGING_DEPTH = 1000
+
+def parse_events(data: dict):
+    """
+    Turn one page of a Discovery API events.json response into table-shaped DataFrames.
+
+    Fields are written into one preallocated list per output column in a single
+    pass, and each DataFrame is built once at the end.
+
+    Returns:
+        events_df, events_details_df, venues_df
+    """
+    raw_events = data['_embedded']['events']
+    n = len(raw_events)
+    date_scraped = datetime.now().strftime('%Y-%m-%d')
+
+    # events / event_details columns
+    event_ids = [None] * n
+    min_ticket_prices = [None] * n
+    event_names = [None] * n
+    genres = [None] * n
+    event_start_dates = [None] * n
+    public_sales_starts = [None] * n
+    public_sales_ends = [None] * n
+    presale_starts = [None] * n
+    presale_ends = [None] * n
+    tracking = [0] * n
+
+    # venues columns
+    venue_ids = [None] * n
+    venue_names = [None] * n
+    cities = [None] * n
+    states = [None] * n
+
+    for i, event in enumerate(raw_events):
+        # Pulling data for events table
+        event_ids[i] = event.get('id', None)
+        min_ticket_prices[i] = event['priceRanges'][0].get('min', 0)
+
+        # Pulling data for the event_details table
+        event_start_date = event['dates']['start']['dateTime']
+        event_start_dates[i] = event_start_date
+        event_names[i] = event.get('name', None)
+        genres[i] = event['classifications'][0]['genre']['name']
+        public_sales_starts[i] = event['sales']['public']['startDateTime']
+        public_sales_ends[i] = event['sales']['public']['endDateTime']
+        # Check if there were presales and get the earliest presale dates
+        presales = event['sales'].get('presales', None)
+        if presales:
+            presale_starts[i] = min(p['startDateTime'] for p in presales)
+            presale_ends[i] = min(p['endDateTime'] for p in presales)
+        # 1 if currently tracking 0 if not
+        tracking[i] = 1 if date_scraped <= event_start_date else 0
+
+        # Pulling data for the venues table
+        venue = event['_embedded']['venues'][0]
+        venue_ids[i] = venue['id']
+        venue_names[i] = venue['name']
+        cities[i] = venue['city']['name']
+        states[i] = venue['state']['stateCode']
+
+    # Convert to dataframe
+    events_df = pd.DataFrame({
+        'id' : event_ids,
+        'min_ticket_price' : min_ticket_prices,
+        'date_scraped' : [date_scraped] * n
+    })
+
+    events_details_df = pd.DataFrame({
+        'event_id' : event_ids,
+        'name' : event_names,
+        'genre' : genres,
+        'event_start_date' : event_start_dates,
+        'public_sales_start' : public_sales_starts,
+        'public_sales_end' : public_sales_ends,
+        'presale_start' : presale_starts,
+        'presale_end' : presale_ends,
+        'tracking' : tracking,
+        'last_tracked' : [date_scraped] * n
+    })
+
+    venues_df = pd.DataFrame({
+        'event_id' : event_ids,
+        'city' : cities,
+        'state' : states,
+        'venue_name' : venue_names,
+        'id' : venue_ids
+    })
+
+    return events_df, events_details_df, venues_df
+
+@profiled('search_event')
+def search_event(key: str, keyword: str, city: Optional[str] = None, size: int = 1):
     """
     Search for an event using the Ticketmaster API.
+    Only the first page of results is read; use search_event_pages for all of them.
     """
     try:
-        url = 'https://app.ticketmaster.com/discovery/v2/events.json'
         params = {
-            "apikey": key,
             "keyword": keyword,
             "countryCode": "US",
             "city": city,
-            "size": 1
+            "size": size
         }
 
-        # Make API call with timeout
-        response = requests.get(url, params=params, timeout=10)
+        # Make API call through the shared client (retries, quota, cache)
+        response = get_client(key).get('/events.json', params=params)
         
         # Check if request was successful
         if response.status_code != 200:
@@ -37,123 +138,286 @@ def search_event(key: str, keyword: str, city: Optional[str] = None):
             print('Search had no results')
             return None, None, None
 
-        # Extract info for events
-        events = []
-        event_details = []
-        venues = []
-
-        for event in data['_embedded']['events']:
-            # Pulling data for events table
-            event_id = event.get('id', None)
-            min_ticket_price = event['priceRanges'][0].get('min', 0)
-            date_scraped = datetime.now().strftime('%Y-%m-%d')
-
-            # Pulling data for the event_details table
-            event_start_date = event['dates']['start']['dateTime']
-            event_name = event.get('name', None)
-            genre = event['classifications'][0]['genre']['name']
-            public_sales_start = event['sales']['public']['startDateTime']
-            public_sales_end = event['sales']['public']['endDateTime']
-            # Check if there were presales and get the earliest and latest presale date
-            presales = event['sales'].get('presales', None)
-            if presales:
-                presale_start_dates = []
-                presale_end_dates = []
-                for p in presales:
-                    presale_start_dates.append(p['startDateTime'])
-                    presale_end_dates.append(p['endDateTime'])
-                presale_start = min(presale_start_dates)
-                presale_end = min(presale_end_dates)
-            else:
-                presale_start = None
-                presale_end = None
-
-            # Pulling data for the venues table
-            venue_id = event['_embedded']['venues'][0]['id']
-            venue_name = event['_embedded']['venues'][0]['name']
-            city = event['_embedded']['venues'][0]['city']['name']
-            state = event['_embedded']['venues'][0]['state']['stateCode']
-
-
-            # Put all results in a dictionary
-            event_dict = {
-                'id' : event_id,
-                'min_ticket_price' : min_ticket_price,
-                'date_scraped' : date_scraped
-            }
+        return parse_events(data)
 
-            event_details_dict = {
-                'event_id' : event_id,
-                'name' : event_name,
-                'genre' : genre,
-                'event_start_date' : event_start_date,
-                'public_sales_start' : public_sales_start,
-                'public_sales_end' : public_sales_end,
-                'presale_start' : presale_start,
-                'presale_end' : presale_end,
-                'tracking' : 1 if date_scraped <= event_start_date else 0, # 1 if currently tracking 0 if not
-                'last_tracked' : date_scraped
-            }
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+        return None, None, None
 
-            venues_dict = {
-                'event_id' : event_id,
-                'city' : city,
-                'state' : state,
-                'venue_name' : venue_name,
-                'id' : venue_id
-            }
+def search_event_pages(key: str, keyword: str, city: Optional[str] = None,
+                       page_size: int = MAX_PAGE_SIZE, max_pages: Optional[int] = None,
+                       client: Optional[TicketmasterClient] = None):
+    """
+    Search for events using the Ticketmaster API, walking every page of results.
 
+    Yields one (events_df, events_details_df, venues_df) chunk per page so callers
+    can transform and load a page while the next one is being fetched. Stops at the
+    last page, at max_pages, or at the API's deep paging limit (page * size < 1000).
 
-            # Add to list
-            events.append(event_dict)
-            event_details.append(event_details_dict)
-            venues.append(venues_dict)
+    Args:
+        key (str): Ticketmaster API key
+        keyword (str): Search keyword, e.g. an artist name
+        city (str): Optional city filter
+        page_size (int): Results per page, capped at the API maximum of 200
+        max_pages (int): Stop after this many pages
+        client (TicketmasterClient): Client to search with, defaults to the shared one for key
+    """
+    client = client or get_client(key)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    page = 0
 
-            # Convert ot dataframe
-            events_df = pd.DataFrame(events)
-            events_details_df = pd.DataFrame(event_details)
-            venues_df = pd.DataFrame(venues)
-        return events_df, events_details_df, venues_df
+    while max_pages is None or page < max_pages:
+        if (page + 1) * page_size > MAX_PAGING_DEPTH:
+            print(f"Reached the API paging limit of {MAX_PAGING_DEPTH} results")
+            return
 
+        params = {
+            "keyword": keyword,
+            "countryCode": "US",
+            "city": city,
+            "size": page_size,
+            "page": page
+        }
+
+        try:
+            response = client.get('/events.json', params=params)
+            if response.status_code != 200:
+                print(f"API request for page {page} failed with status code: {response.status_code}")
+                return
+            data = response.json()
+        except QuotaExhausted as e:
+            print(f"Stopping search before page {page}: {str(e)}")
+            return
+        except Exception as e:
+            print(f"Error occurred on page {page}: {str(e)}")
+            return
+
+        if '_embedded' not in data:
+            if page == 0:
+                print('Search had no results')
+            return
+
+        try:
+            yield parse_events(data)
+        except Exception as e:
+            print(f"Error parsing page {page}: {str(e)}")
+
+        page += 1
+        total_pages = data.get('page', {}).get('totalPages', page)
+        if page >= total_pages:
+            return
+
+def fetch_event_price(event_id: str, client: TicketmasterClient, current_date: str):
+    """
+    Get the current minimum price for a single event.
+
+    Args:
+        event_id (str): Ticketmaster event id
+        client (TicketmasterClient): Shared API client
+        current_date (str): Date stamped on the row as date_scraped
+
+    Returns:
+        dict: Row matching the events table, or None if the lookup failed
+
+    Raises:
+        QuotaExhausted: The daily quota reserve was reached
+    """
+    try:
+        response = client.get(f"/events/{event_id}.json")
+        
+        if response.status_code == 200:
+            data = response.json()
+            if not data.get('priceRanges'):
+                print(f"No price listed for event {event_id}")
+                return None
+            min_price = data['priceRanges'][0]['min']
+            print(f"Updated price for event {event_id}: ${min_price}")
+            return {
+                'id': event_id,
+                'min_ticket_price': min_price,
+                'date_scraped': current_date
+            }
+
+        print(f"Failed to get data for event {event_id}")
+            
+    except QuotaExhausted:
+        raise
     except Exception as e:
-        print(f"Error occurred: {str(e)}")
-        return None, None, None
+        print(f"Error processing event {event_id}: {str(e)}")
+
+    return None
 
-def track_current_events():
+def fetch_event_prices_batch(event_ids: list, client: TicketmasterClient, current_date: str):
     """
-    Gets current prices for all tracked events.
-    Also updates tracking to 0 for events that have passed.
-    
+    Get current minimum prices for several events with a single events.json call.
+
+    Args:
+        event_ids (list): Ticketmaster event ids, at most one page worth
+        client (TicketmasterClient): Shared API client
+        current_date (str): Date stamped on the rows as date_scraped
+
     Returns:
-        events_df: DataFrame with current prices (matches events table structure)
-        event_details_tracking_df: DataFrame with event details (matches event_details table structure)
+        rows (list): Rows matching the events table for the events that came back
+            with a price
+        missing_ids (list): Requested ids that were not in the response. Events that
+            came back without a price are not listed: another call wouldn't find one
+
+    Raises:
+        QuotaExhausted: The daily quota reserve was reached
     """
     try:
-        # 1. Set up database and API connections
-        load_dotenv()
-        api_key = os.getenv('CONSUMER_KEY')
-        pg_user = os.getenv('POSTGRESQL_USER')
-        pg_password = os.getenv('POSTGRESQL_PASSWORD')
-
-        # 2. Create database connection (using psycopg2 directly)
-        conn = psycopg2.connect(
-            host=os.getenv('POSTGRESQL_HOST'),
-            database="ticket_trail_db",
-            user=os.getenv('POSTGRESQL_USER'),
-            password=os.getenv('POSTGRESQL_PASSWORD')
-        )
+        response = client.get('/events.json', params={
+            'id': ','.join(event_ids),
+            'size': len(event_ids)
+        })
 
+        if response.status_code != 200:
+            print(f"Batch request for {len(event_ids)} events failed with status code: {response.status_code}")
+            return [], list(event_ids)
+
+        data = response.json()
+        returned = {
+            event['id']: event
+            for event in data.get('_embedded', {}).get('events', [])
+        }
+
+        rows = []
+        missing_ids = []
+        for event_id in event_ids:
+            event = returned.get(event_id)
+            if event is None:
+                missing_ids.append(event_id)
+                continue
+            if not event.get('priceRanges'):
+                print(f"No price listed for event {event_id}")
+                continue
+
+            min_price = event['priceRanges'][0]['min']
+            print(f"Updated price for event {event_id}: ${min_price}")
+            rows.append({
+                'id': event_id,
+                'min_ticket_price': min_price,
+                'date_scraped': current_date
+            })
+        return rows, missing_ids
+
+    except QuotaExhausted:
+        raise
+    except Exception as e:
+        print(f"Error processing batch of {len(event_ids)} events: {str(e)}")
+        return [], list(event_ids)
+
+def _gather(futures):
+    """
+    Collect results as the futures complete. After the first QuotaExhausted,
+    calls that haven't started are cancelled, but every result already
+    fetched (and paid for) is kept.
+
+    Returns:
+        tuple: (results, the QuotaExhausted raised or None)
+    """
+    results = []
+    quota_error = None
+    for future in as_completed(futures):
+        if future.cancelled():
+            continue
+        try:
+            results.append(future.result())
+        except QuotaExhausted as e:
+            if quota_error is None:
+                quota_error = e
+                for pending in futures:
+                    pending.cancel()
+    return results, quota_error
+
+def fetch_current_prices(event_ids: list, client: TicketmasterClient, current_date: str,
+                         executor: ThreadPoolExecutor, batch_size: int = EVENT_BATCH_SIZE):
+    """
+    Fetch current prices for `event_ids` on an existing thread pool.
+
+    Ids are grouped into batches of batch_size per events.json call; ids missing
+    from a batch response are retried one at a time. If the client hits its
+    daily quota reserve, fetching stops and every price gathered so far is returned.
+
+    Returns:
+        list: Rows matching the events table for every event that returned a price
+    """
+    events_data = []
+    if batch_size > 1:
+        batches = [
+            event_ids[i:i + batch_size]
+            for i in range(0, len(event_ids), batch_size)
+        ]
+        results, quota_error = _gather([
+            executor.submit(fetch_event_prices_batch, batch, client, current_date)
+            for batch in batches
+        ])
+        missing_ids = []
+        for rows, missing in results:
+            events_data.extend(rows)
+            missing_ids.extend(missing)
+
+        if quota_error is not None:
+            print(f"Stopping price refresh early: {str(quota_error)}")
+            return events_data
+
+        if missing_ids:
+            print(f"{len(missing_ids)} events missing from batch responses, fetching individually")
+    else:
+        missing_ids = event_ids
+
+    results, quota_error = _gather([
+        executor.submit(fetch_event_price, event_id, client, current_date)
+        for event_id in missing_ids
+    ])
+    events_data.extend(row for row in results if row is not None)
+    if quota_error is not None:
+        print(f"Stopping price refresh early: {str(quota_error)}")
+
+    return events_data
+
+def iter_tracked_events(max_workers: int = 8, requests_per_second: Optional[float] = None,
+                        batch_size: int = EVENT_BATCH_SIZE, chunk_size: Optional[int] = None, conn=None,
+                        shard: int = 0, num_shards: int = 1, due_only: bool = True,
+                        daily_quota: Optional[int] = None):
+    """
+    Refresh tracked events chunk by chunk.
+
+    Yields (events_df, event_details_df) for every chunk_size tracked events as
+    soon as that chunk's prices are in, so a consumer can load one chunk while
+    the next is being fetched. Nothing is written here: event_details_df carries
+    the new tracking, last_tracked, next_poll_at and failed_polls, and load_to_sql
+    stores them together with the prices, so a failed load leaves the events due. Arguments
+    match track_current_events; chunk_size=None refreshes everything as one chunk.
+    Errors are raised to the caller.
+
+    With due_only, only events whose next_poll_at has passed (or was never set)
+    are fetched, most overdue first, and each refreshed event gets a new
+    next_poll_at from etl.scheduler; events whose price fetch failed are
+    retried on a growing backoff.
+    """
+    # 1. Set up API key
+    load_dotenv()
+    api_key = os.getenv('CONSUMER_KEY')
+
+    # 2. Borrow a database connection from the shared pool
+    with get_connection(conn) as conn:
         # 3. Get all events that we're tracking
         query = """
             SELECT *
             FROM event_details
             WHERE tracking = 1
+            AND (hashtext(event_id) & 2147483647) %% %s = %s
+            AND (NOT %s OR next_poll_at IS NULL OR next_poll_at <= now())
+            ORDER BY next_poll_at NULLS FIRST
         """
-        event_details_tracking_df = pd.read_sql(query, con=conn)
+        event_details_tracking_df = pd.read_sql(query, con=conn, params=(num_shards, shard, due_only))
 
         if event_details_tracking_df.empty:
-            print("No events are currently being tracked")
-            return None, None
+            print("No tracked events are due for a price check")
+            return
+
+        volatility = load_volatility(conn, event_details_tracking_df['event_id'])
 
         # 4. Update tracking status and last_tracked date
         current_date = datetime.now().strftime('%Y-%m-%d')
@@ -161,72 +425,106 @@ def track_current_events():
         
         # Update tracking status based on event date
         event_details_tracking_df['last_tracked'] = current_date
-        event_details_tracking_df['tracking'] = event_details_tracking_df.apply(
-            lambda row: 0 if pd.to_datetime(row['event_start_date']).date() <= current_date_dt else 1, 
-            axis=1
-        )
-
-        # 5. Get current prices (rest of your existing code)
-        events_data = []
-        for _, row in event_details_tracking_df.iterrows():
-            event_id = row['event_id']
-            
-            # Skip if we just marked this event as not tracking
-            if row['tracking'] == 0:
-                print(f"Event {event_id} has passed and will no longer be tracked")
-                continue
-                
-            try:
-                url = f"https://app.ticketmaster.com/discovery/v2/events/{event_id}.json"
-                response = requests.get(
-                    url, 
-                    params={'apikey': api_key}, 
-                    timeout=10
+        event_start = pd.to_datetime(event_details_tracking_df['event_start_date']).dt.normalize()
+        event_details_tracking_df['tracking'] = (event_start > pd.Timestamp(current_date_dt)).astype(int)
+
+        passed = event_details_tracking_df['tracking'] == 0
+        for event_id in event_details_tracking_df.loc[passed, 'event_id']:
+            print(f"Event {event_id} has passed and will no longer be tracked")
+
+        # 5. Get current prices concurrently, throttled to the API rate limit
+        if requests_per_second is None and daily_quota is None:
+            client = get_client(api_key)
+        else:
+            client = TicketmasterClient(
+                api_key,
+                requests_per_second=requests_per_second or TICKETMASTER_RATE_LIMIT,
+                daily_quota=daily_quota or TICKETMASTER_DAILY_QUOTA
+            )
+        chunk_size = chunk_size or len(event_details_tracking_df)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for start in range(0, len(event_details_tracking_df), chunk_size):
+                chunk_df = event_details_tracking_df.iloc[start:start + chunk_size].copy()
+                previous_poll = chunk_df['next_poll_at'].astype(object)
+                active_event_ids = chunk_df.loc[chunk_df['tracking'] == 1, 'event_id'].tolist()
+                events_data = fetch_current_prices(
+                    active_event_ids, client, current_date, executor, batch_size
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    min_price = data['priceRanges'][0]['min']
-                    
-                    events_data.append({
-                        'id': event_id,
-                        'min_ticket_price': min_price,
-                        'date_scraped': current_date
-                    })
-                    print(f"Updated price for event {event_id}: ${min_price}")
+
+                # 6. Create events DataFrame. A chunk without prices is still yielded so
+                # passed events get tracking = 0 and failed ones stay due.
+                if not events_data:
+                    print("No price updates were successful")
+
+                # Schedule the next check. Events whose price couldn't be fetched back off
+                # by failed_polls, unless the quota ran out first: those keep their schedule
+                # and stay due for the next run.
+                chunk_df['next_poll_at'] = compute_next_poll(chunk_df, volatility=volatility)
+                fetched_ids = {row['id'] for row in events_data}
+                failed = (chunk_df['tracking'] == 1) & ~chunk_df['event_id'].isin(fetched_ids)
+                if client.quota_exhausted:
+                    chunk_df.loc[failed, 'next_poll_at'] = previous_poll[failed]
                 else:
-                    print(f"Failed to get data for event {event_id}")
-                    
-            except Exception as e:
-                print(f"Error processing event {event_id}: {str(e)}")
-                continue
+                    chunk_df['failed_polls'] = (chunk_df['failed_polls'] + 1).where(failed, 0)
+                    chunk_df.loc[failed, 'next_poll_at'] = compute_retry_poll(chunk_df.loc[failed, 'failed_polls'])
 
-        # 6. Create events DataFrame
-        if events_data:
-            events_df = pd.DataFrame(events_data)
-        else:
-            print("No price updates were successful")
-            return None, None
+                # 7. tracking, last_tracked, next_poll_at and failed_polls travel with the
+                # chunk and are written by load_to_sql in the same transaction as the prices
 
-        # 7. Update database with new tracking status
-        cursor = conn.cursor()
-        for _, row in event_details_tracking_df.iterrows():
-            cursor.execute("""
-                UPDATE event_details 
-                SET tracking = %s, last_tracked = %s
-                WHERE event_id = %s
-            """, (row['tracking'], current_date, row['event_id']))
-        
-        # 8. Commit changes and close connections
-        conn.commit()
-        cursor.close()
-        conn.close()
+                yield pd.DataFrame(events_data, columns=PRICE_COLUMNS), chunk_df
+
+                if client.quota_exhausted:
+                    print("Daily API quota reserve reached, remaining events stay due for the next run")
+                    return
+
+@profiled('track_current_events')
+def track_current_events(max_workers: int = 8, requests_per_second: Optional[float] = None,
+                         batch_size: int = EVENT_BATCH_SIZE, conn=None,
+                         shard: int = 0, num_shards: int = 1, due_only: bool = True,
+                         daily_quota: Optional[int] = None):
+    """
+    Gets current prices for all tracked events.
+    Also sets tracking to 0 for events that have passed; load the returned
+    event_details_df with load_to_sql to store it with the new prices.
+
+    Prices are fetched concurrently on a bounded thread pool through the shared
+    TicketmasterClient, whose token bucket keeps the combined request rate under
+    the API limit and whose quota accounting stops the run before the key is exhausted.
+    Event ids are grouped into batches of batch_size per events.json call; ids
+    missing from a batch response are retried one at a time.
+    
+    Args:
+        max_workers (int): Number of requests in flight at the same time (1 = sequential)
+        requests_per_second (float): Request rate for this run, defaults to the shared client's limit
+        batch_size (int): Event ids per API call (1 = one call per event)
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+        shard (int): Which slice of the tracked events to refresh (0 .. num_shards - 1)
+        num_shards (int): Number of slices the tracked events are split into by event_id hash
+        due_only (bool): Only refresh events whose next_poll_at has passed
+        daily_quota (int): API calls per UTC day for the key, counted across every
+            run and process (see etl.client), defaults to the key's full quota
+
+    Returns:
+        events_df: DataFrame with current prices (matches events table structure)
+        event_details_tracking_df: DataFrame with event details (matches event_details table structure)
+    """
+    try:
+        chunks = list(iter_tracked_events(
+            max_workers=max_workers,
+            requests_per_second=requests_per_second,
+            batch_size=batch_size,
+            conn=conn,
+            shard=shard,
+            num_shards=num_shards,
+            due_only=due_only,
+            daily_quota=daily_quota
+        ))
+        if not chunks:
+            return None, None
 
+        events_df, event_details_tracking_df = chunks[0]
         return events_df, event_details_tracking_df
 
     except Exception as e:
         print(f"Error in track_current_events: {str(e)}")
-        if 'conn' in locals():
-            conn.close()
         return None, None
-  
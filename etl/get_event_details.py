@@ -1,45 +1,55 @@
 from dotenv import load_dotenv
 import os
-import requests
+import sys
+from etl.client import get_client
 import json
 
-# Load in API keys
-load_dotenv()
-
-api_key = os.getenv('CONSUMER_KEY')
-api_url_venue_search = "https://app.ticketmaster.com/discovery/v2/venues.json"
-venue_id = 'KovZpZAEdntA'
-api_url_venue_details =  f"https://app.ticketmaster.com/discovery/v2/venues/{venue_id}.json"
-
-# Specify params
-params = {
-    "apikey" : api_key,
-    "countryCode" : "US"
-}
-
-#Get response TO GET EVENT DETAILS
-response = requests.get(api_url_venue_details, params=params)
-
-# Process the response
-try:
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-
-        # Extract specific venue details
-        venue_name = data.get("name", "Unknown Venue")
-        city = data.get("city", {}).get("name", "Unknown City")
-        state = data.get("state", {}).get("stateCode", "Unknown State")
-
-        # Print the extracted details
-        print(f"Venue Name: {venue_name}")
-        print(f"City: {city}")
-        print(f"State: {state}")
-
-    else:
-        print(f"Failed to fetch venue details. Status code: {response.status_code}")
-except Exception as e:
-    print("An error occurred:", e)
-
-
-
+def get_event_details(api_key, event_id):
+    """
+    Fetch one event from the Discovery API.
+
+    Returns:
+        dict: Event name, date, venue and lowest listed price, or None if the request failed
+    """
+    params = {
+        "apikey" : api_key,
+        "countryCode" : "US"
+    }
+    response = get_client(api_key).get(f"/events/{event_id}.json", params=params)
+
+    if response.status_code != 200:
+        print(f"Failed to fetch event details. Status code: {response.status_code}")
+        return None
+
+    data = response.json()
+    venue = data.get("_embedded", {}).get("venues", [{}])[0]
+    price_ranges = data.get("priceRanges") or [{}]
+    return {
+        "id": event_id,
+        "name": data.get("name", "Unknown Event"),
+        "date": data.get("dates", {}).get("start", {}).get("localDate", "Unknown Date"),
+        "venue_name": venue.get("name", "Unknown Venue"),
+        "city": venue.get("city", {}).get("name", "Unknown City"),
+        "state": venue.get("state", {}).get("stateCode", "Unknown State"),
+        "min_price": price_ranges[0].get("min")
+    }
+
+if __name__ == "__main__":
+    # Load in API keys
+    load_dotenv()
+    api_key = os.getenv('CONSUMER_KEY')
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m etl.get_event_details EVENT_ID")
+        sys.exit(1)
+
+    try:
+        event = get_event_details(api_key, sys.argv[1])
+        if event is not None:
+            # Print the extracted details
+            print(f"Event Name: {event['name']}")
+            print(f"Date: {event['date']}")
+            print(f"Venue: {event['venue_name']}, {event['city']}, {event['state']}")
+            print(f"Min Price: {event['min_price']}")
+    except Exception as e:
+        print("An error occurred:", e)
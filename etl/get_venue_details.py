@@ -1,45 +1,75 @@
 from dotenv import load_dotenv
 import os
-import requests
+from etl.client import get_client
+from etl.db import get_connection
+from etl import venue_cache
 import json
 
-# Load in API keys
-load_dotenv()
+def get_venue_details(api_key, venue_id):
+    """
+    Fetch one venue from the Discovery API.
 
-api_key = os.getenv('CONSUMER_KEY')
-api_url_venue_search = "https://app.ticketmaster.com/discovery/v2/venues.json"
-venue_id = 'KovZpZAEdntA'
-api_url_venue_details =  f"https://app.ticketmaster.com/discovery/v2/venues/{venue_id}.json"
+    Returns:
+        dict: venue_name, city and state, or None if the request failed
+    """
+    params = {
+        "apikey" : api_key,
+        "countryCode" : "US"
+    }
+    response = get_client(api_key).get(f"/venues/{venue_id}.json", params=params)
 
-# Specify params
-params = {
-    "apikey" : api_key,
-    "countryCode" : "US"
-}
+    if response.status_code != 200:
+        print(f"Failed to fetch venue details. Status code: {response.status_code}")
+        return None
 
-#Get response TO GET EVENT DETAILS
-response = requests.get(api_url_venue_details, params=params)
+    data = response.json()
+    return {
+        "id": venue_id,
+        "venue_name": data.get("name", "Unknown Venue"),
+        "city": data.get("city", {}).get("name", "Unknown City"),
+        "state": data.get("state", {}).get("stateCode", "Unknown State")
+    }
 
-# Process the response
-try:
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
+def get_new_venue_details(api_key, venue_ids, conn=None):
+    """
+    Fetch details only for venues that aren't stored yet. Known venues are
+    answered from the venue cache without an API call.
 
-        # Extract specific venue details
-        venue_name = data.get("name", "Unknown Venue")
-        city = data.get("city", {}).get("name", "Unknown City")
-        state = data.get("state", {}).get("stateCode", "Unknown State")
+    Args:
+        api_key (str): Ticketmaster API key
+        venue_ids (iterable): Venue ids to look up
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
 
-        # Print the extracted details
-        print(f"Venue Name: {venue_name}")
-        print(f"City: {city}")
-        print(f"State: {state}")
+    Returns:
+        list: Venue detail dicts for the new venues that could be fetched
+    """
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            new_ids = venue_cache.new_venue_ids(cursor, venue_ids)
+        finally:
+            cursor.close()
 
-    else:
-        print(f"Failed to fetch venue details. Status code: {response.status_code}")
-except Exception as e:
-    print("An error occurred:", e)
+    details = []
+    for venue_id in new_ids:
+        venue = get_venue_details(api_key, venue_id)
+        if venue is not None:
+            details.append(venue)
+    return details
 
+if __name__ == "__main__":
+    # Load in API keys
+    load_dotenv()
 
+    api_key = os.getenv('CONSUMER_KEY')
+    venue_id = 'KovZpZAEdntA'
 
+    try:
+        venue = get_venue_details(api_key, venue_id)
+        if venue is not None:
+            # Print the extracted details
+            print(f"Venue Name: {venue['venue_name']}")
+            print(f"City: {venue['city']}")
+            print(f"State: {venue['state']}")
+    except Exception as e:
+        print("An error occurred:", e)
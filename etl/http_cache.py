@@ -0,0 +1,199 @@
+"""
+On-disk HTTP response cache for Ticketmaster API calls.
+
+Responses are stored in a local SQLite file keyed by URL and query params
+(the API key is left out of the key). Each endpoint has its own TTL; once an
+entry is stale it is revalidated with ETag / Last-Modified when the server
+sent them. The file is kept under a size budget by evicting the least
+recently used entries.
+
+Set TICKET_TRAIL_HTTP_CACHE to a file path to move the cache, or to "off"
+to bypass it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import requests
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'ticket_trail', 'http_cache.sqlite')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# (url pattern, seconds) - first match wins. Venues rarely change; prices do.
+ENDPOINT_TTLS = [
+    (re.compile(r'/discovery/v2/venues'), 7 * 24 * 3600),
+    (re.compile(r'/discovery/v2/events/[^/]+\.json'), 3600),
+    (re.compile(r'/discovery/v2/events\.json'), 3600),
+]
+DEFAULT_TTL = 3600
+
+# Params that don't change the response body
+IGNORED_PARAMS = {'apikey'}
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response when the body comes from the cache.
+    """
+
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.content)
+
+def ttl_for(url):
+    """
+    Seconds a cached response for `url` stays fresh.
+    """
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+def cache_key(url, params=None):
+    """
+    Stable key for a request: URL plus sorted params, without the API key.
+    """
+    items = sorted(
+        (k, str(v)) for k, v in (params or {}).items()
+        if v is not None and k not in IGNORED_PARAMS
+    )
+    return hashlib.sha256(json.dumps([url, items]).encode()).hexdigest()
+
+class ResponseCache:
+    """
+    Thread-safe SQLite response store with per-endpoint TTLs and LRU eviction.
+
+    Args:
+        path (str): SQLite file to use
+        max_bytes (int): Size budget for stored bodies
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_idx ON responses (accessed_at)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url, params=None, timeout=10, session=None):
+        """
+        GET through the cache.
+
+        Fresh entries are returned without a request. Stale entries are
+        revalidated with If-None-Match / If-Modified-Since; a 304 refreshes the
+        entry. Only 200 responses are stored.
+
+        Returns:
+            requests.Response on a network fetch, CachedResponse when served from disk
+        """
+        key = cache_key(url, params)
+        now = time.time()
+
+        with self._lock:
+            entry = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if entry is not None:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+
+        headers = {}
+        if entry is not None:
+            body, etag, last_modified, fetched_at = entry
+            if now - fetched_at < ttl_for(url):
+                return CachedResponse(200, body)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = (session or requests).get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._db.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            return CachedResponse(200, entry[0], response.headers)
+
+        if response.status_code == 200:
+            self._store(key, url, response)
+        return response
+
+    def _store(self, key, url, response):
+        body = response.content
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute("""
+                INSERT OR REPLACE INTO responses
+                (key, url, body, etag, last_modified, fetched_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key, url, body,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                now, now, len(body)
+            ))
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until back under the budget
+        excess = self._total_bytes - self.max_bytes
+        stale_keys = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+            self._total_bytes -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._total_bytes = 0
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """
+    Process-wide cache configured from TICKET_TRAIL_HTTP_CACHE, or None when disabled.
+    """
+    global _cache
+    setting = os.getenv('TICKET_TRAIL_HTTP_CACHE', DEFAULT_CACHE_PATH)
+    if setting.lower() in ('off', '0', 'false', ''):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(setting)
+    return _cache
@@ -1,105 +1,393 @@
-from dotenv import load_dotenv
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-import os
 import pandas as pd
-from sqlalchemy import create_engine
-from contextlib import contextmanager
+import io
+import os
+from psycopg2.extras import execute_values
+from etl import metrics, venue_cache
+from etl.db import get_connection
+from etl.migrate import ensure_event_partitions
+from etl.price_history import refresh_price_rollups
+from etl.profiling import profiled
+
+EVENTS_COLUMNS = ['id', 'min_ticket_price', 'date_scraped']
+EVENT_DETAILS_COLUMNS = [
+    'event_id', 'name', 'genre', 'event_start_date',
+    'public_sales_start', 'public_sales_end',
+    'presale_start', 'presale_end', 'tracking', 'last_tracked'
+]
+VENUES_COLUMNS = ['id', 'event_id', 'city', 'state', 'venue_name']
+# Written alongside the tracking flags when the caller supplies them (tracked-event refreshes)
+SCHEDULE_COLUMNS = ['next_poll_at', 'failed_polls']
+EVENT_VENUES_COLUMNS = ['event_id', 'venue_id']
+
+# Callbacks run with the set of event ids whose prices a load just committed
+_price_listeners = []
+
+# 'rows' appends one events row per scrape; 'intervals' only records price changes
+# in event_price_intervals. The events_daily view reads back either one.
+PRICE_STORAGE_MODES = ('rows', 'intervals')
+
+def copy_to_staging(cursor, df, table, columns):
+    """
+    Stream a DataFrame into a temporary staging table shaped like `table` using COPY.
+    The staging table is dropped when the transaction commits.
+
+    Args:
+        cursor: psycopg2 cursor inside an open transaction
+        df (DataFrame): Rows to stage
+        table (str): Target table the staging table copies its columns from
+        columns (list): Columns to copy, in order
+
+    Returns:
+        str: Name of the staging table
+    """
+    staging = f"{table}_staging"
+    cursor.execute(f"""
+        CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)
+        ON COMMIT DROP
+    """)
+
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+    return staging
+
+def merge_price_intervals(cursor, source):
+    """
+    Run-length encode new prices into event_price_intervals.
+
+    An unchanged price extends the event's current interval to the new date; a
+    changed price closes it and opens a new one. One price is kept per event per
+    day (the lowest in the batch, and a later load on the same day replaces it).
+
+    Args:
+        cursor: psycopg2 cursor inside the load transaction
+        source (str): Table or staging table with id, min_ticket_price, date_scraped columns
+    """
+    cursor.execute(f"""
+        SELECT DISTINCT date_scraped FROM {source}
+        WHERE date_scraped IS NOT NULL
+        ORDER BY date_scraped
+    """)
+    days = [row[0] for row in cursor.fetchall()]
+
+    changed = 0
+    opened = 0
+    updated = 0
+    for day in days:
+        cursor.execute(f"""
+            CREATE TEMP TABLE price_interval_incoming ON COMMIT DROP AS
+            SELECT id AS event_id, min(min_ticket_price) AS price
+            FROM {source}
+            WHERE date_scraped = %s AND id IS NOT NULL
+            GROUP BY id
+        """, (day,))
+
+        # Same price as the current interval: extend it
+        cursor.execute("""
+            UPDATE event_price_intervals t
+            SET valid_to = %s
+            FROM price_interval_incoming i
+            WHERE t.event_id = i.event_id AND t.is_current
+            AND t.min_ticket_price IS NOT DISTINCT FROM i.price
+            AND t.valid_to < %s
+        """, (day, day))
+        updated += cursor.rowcount
+
+        # Current interval started today: the newer price for the day wins
+        cursor.execute("""
+            UPDATE event_price_intervals t
+            SET min_ticket_price = i.price
+            FROM price_interval_incoming i
+            WHERE t.event_id = i.event_id AND t.is_current
+            AND t.valid_from = %s
+            AND t.min_ticket_price IS DISTINCT FROM i.price
+        """, (day,))
+        replaced = cursor.rowcount
+        updated += replaced
+
+        # Price changed: close the current interval ...
+        cursor.execute("""
+            UPDATE event_price_intervals t
+            SET is_current = false, valid_to = LEAST(t.valid_to, %s::date - 1)
+            FROM price_interval_incoming i
+            WHERE t.event_id = i.event_id AND t.is_current
+            AND t.valid_from < %s
+            AND t.min_ticket_price IS DISTINCT FROM i.price
+        """, (day, day))
+        updated += cursor.rowcount
+
+        # ... and open a new one (also covers events seen for the first time)
+        cursor.execute("""
+            INSERT INTO event_price_intervals (event_id, min_ticket_price, valid_from, valid_to)
+            SELECT i.event_id, i.price, %s, %s
+            FROM price_interval_incoming i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM event_price_intervals t
+                WHERE t.event_id = i.event_id AND t.is_current
+            )
+        """, (day, day))
+        opened += cursor.rowcount
+        changed += replaced + cursor.rowcount
+
+        cursor.execute("DROP TABLE price_interval_incoming")
+
+    print(f"Recorded {changed} price changes")
+    metrics.record_rows('event_price_intervals', inserted=opened, updated=updated)
+
+def report_venues(venues, new_venues):
+    """
+    Log and count inserted vs already-stored venues, by distinct venue id.
+    """
+    skipped = venues['id'].nunique() - len(new_venues)
+    print(f"Added {len(new_venues)} new venues, skipped {skipped} known")
+    metrics.record_rows('venues', inserted=len(new_venues), skipped=skipped)
+
+def load_event_venues(cursor, venues):
+    """
+    Record which venue each event is at. Runs for every load, whether or not
+    the venue itself is new.
+
+    Args:
+        cursor: psycopg2 cursor inside the load transaction
+        venues (DataFrame): Venue rows with id and event_id columns
+    """
+    pairs = venues[['event_id', 'id']].dropna().drop_duplicates()
+    if pairs.empty:
+        return
+    added = execute_values(cursor, """
+        INSERT INTO event_venues (event_id, venue_id)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    """, list(pairs.itertuples(index=False, name=None)), page_size=1000, fetch=True)
+    metrics.record_rows('event_venues', inserted=len(added), skipped=len(pairs) - len(added))
+
+def event_details_columns(event_details):
+    """
+    Columns of event_details to write, and the extra ON CONFLICT assignments:
+    next_poll_at and failed_polls are written in the same transaction as the
+    prices when present.
+    """
+    schedule = [column for column in SCHEDULE_COLUMNS if column in event_details.columns]
+    updates = ''.join(f",\n    {column} = EXCLUDED.{column}" for column in schedule)
+    return EVENT_DETAILS_COLUMNS + schedule, updates
+
+def bulk_load(cursor, events=None, event_details=None, venues=None, price_storage='rows'):
+    """
+    Set-based load: COPY each DataFrame into staging, then merge with one
+    INSERT ... ON CONFLICT per table. Runs inside the caller's transaction.
+
+    Returns:
+        list: Venue ids inserted, to mark as known once the transaction commits
+    """
+    new_venues = []
+    if events is not None and not events.empty and price_storage == 'intervals':
+        print('Loading price changes')
+        staging = copy_to_staging(cursor, events, 'events', EVENTS_COLUMNS)
+        merge_price_intervals(cursor, staging)
+        refresh_price_rollups(cursor, staging)
+
+    elif events is not None and not events.empty:
+        print('Loading events')
+        ensure_event_partitions(cursor, events['date_scraped'].unique())
+        staging = copy_to_staging(cursor, events, 'events', EVENTS_COLUMNS)
+        cursor.execute(f"""
+            INSERT INTO events (id, min_ticket_price, date_scraped)
+            SELECT DISTINCT id, min_ticket_price, date_scraped
+            FROM {staging}
+            ON CONFLICT (id, date_scraped, min_ticket_price) DO NOTHING
+        """)
+        print(f"Added {cursor.rowcount} new prices, skipped {len(events) - cursor.rowcount} duplicates")
+        metrics.record_rows('events', inserted=cursor.rowcount, skipped=len(events) - cursor.rowcount)
+        refresh_price_rollups(cursor, staging)
+
+    if event_details is not None and not event_details.empty:
+        print('Loading event_details')
+        columns, schedule_update = event_details_columns(event_details)
+        staging = copy_to_staging(cursor, event_details, 'event_details', columns)
+        cursor.execute(f"""
+            INSERT INTO event_details ({', '.join(columns)})
+            SELECT DISTINCT ON (event_id) {', '.join(columns)}
+            FROM {staging}
+            ORDER BY event_id
+            ON CONFLICT (event_id) 
+            DO UPDATE SET
+                tracking = EXCLUDED.tracking,
+                last_tracked = EXCLUDED.last_tracked{schedule_update}
+            RETURNING (xmax = 0) AS inserted
+        """)
+        written = [row[0] for row in cursor.fetchall()]
+        metrics.record_rows(
+            'event_details',
+            inserted=sum(written),
+            updated=len(written) - sum(written),
+            skipped=len(event_details) - len(written)
+        )
+
+    if venues is not None and not venues.empty:
+        print('Loading venues')
+        new_venues = venue_cache.new_venue_ids(cursor, venues['id'])
+        if new_venues:
+            staging = copy_to_staging(
+                cursor, venues[venues['id'].isin(new_venues)], 'venues', VENUES_COLUMNS
+            )
+            cursor.execute(f"""
+                INSERT INTO venues (id, event_id, city, state, venue_name)
+                SELECT DISTINCT ON (id) id, event_id, city, state, venue_name
+                FROM {staging}
+                ORDER BY id
+                ON CONFLICT (id) DO NOTHING
+            """)
+        report_venues(venues, new_venues)
+        load_event_venues(cursor, venues)
+
+    return new_venues
+
+def row_load(cursor, events=None, event_details=None, venues=None, price_storage='rows'):
+    """
+    Row-by-row load, one statement per row. Runs inside the caller's transaction.
+    Price intervals and the event_venues mapping are always merged set-based.
+
+    Returns:
+        list: Venue ids inserted, to mark as known once the transaction commits
+    """
+    new_venues = []
+    if events is not None and not events.empty and price_storage == 'intervals':
+        print('Loading price changes')
+        staging = copy_to_staging(cursor, events, 'events', EVENTS_COLUMNS)
+        merge_price_intervals(cursor, staging)
+        refresh_price_rollups(cursor, staging)
+
+    # Load data into the `events` table
+    elif events is not None and not events.empty:
+        print('Loading events')
+        ensure_event_partitions(cursor, events['date_scraped'].unique())
+        for _, row in events.iterrows():
+            # Duplicate prices are rejected by the unique constraint on events
+            cursor.execute("""
+                INSERT INTO events (id, min_ticket_price, date_scraped)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (id, date_scraped, min_ticket_price) DO NOTHING
+            """, (row['id'], row['min_ticket_price'], row['date_scraped']))
+
+            if cursor.rowcount:
+                print(f"Added new price ${row['min_ticket_price']} for event {row['id']}")
+                metrics.record_rows('events', inserted=1)
+            else:
+                print(f"Skipping duplicate price for event {row['id']} on {row['date_scraped']}")
+                metrics.record_rows('events', skipped=1)
+
+        staging = copy_to_staging(cursor, events, 'events', EVENTS_COLUMNS)
+        refresh_price_rollups(cursor, staging)
+
+    # Load data into the `event_details` table
+    if event_details is not None:
+        print('Loading event_details')
+        columns, schedule_update = event_details_columns(event_details)
+        for _, row in event_details.iterrows():
+            cursor.execute(f"""
+                INSERT INTO event_details ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+                ON CONFLICT (event_id) 
+                DO UPDATE SET
+                    tracking = EXCLUDED.tracking,
+                    last_tracked = EXCLUDED.last_tracked{schedule_update}
+                RETURNING (xmax = 0) AS inserted
+            """, tuple(None if pd.isna(row[column]) else row[column] for column in columns))
+            if cursor.fetchone()[0]:
+                metrics.record_rows('event_details', inserted=1)
+            else:
+                metrics.record_rows('event_details', updated=1)
+
+    # Load data into the `venues` table
+    if venues is not None:
+        print('Loading venues')
+        new_venues = venue_cache.new_venue_ids(cursor, venues['id'])
+        for _, row in venues[venues['id'].isin(new_venues)].iterrows():
+            cursor.execute("""
+                INSERT INTO venues (id, event_id, city, state, venue_name)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (id) DO NOTHING
+            """, (row['id'], row['event_id'], row['city'], row['state'], row['venue_name']))
+        report_venues(venues, new_venues)
+        load_event_venues(cursor, venues)
+
+    return new_venues
+
+def add_price_listener(callback):
+    """
+    Register callback(event_ids) to run after load_to_sql commits new prices,
+    e.g. to invalidate caches built from price history. Only loads made by
+    this process are reported.
+    """
+    if callback not in _price_listeners:
+        _price_listeners.append(callback)
+
+def remove_price_listener(callback):
+    if callback in _price_listeners:
+        _price_listeners.remove(callback)
+
+def _notify_price_listeners(events):
+    if events is None or events.empty or not _price_listeners:
+        return
+    event_ids = set(events['id'].dropna())
+    for callback in list(_price_listeners):
+        try:
+            callback(event_ids)
+        except Exception as e:
+            print(f"Price listener {callback!r} failed: {str(e)}")
 
-def load_to_sql(pg_user, pg_password, events=None, event_details=None, venues=None):
+@profiled('load_to_sql')
+def load_to_sql(pg_user=None, pg_password=None, events=None, event_details=None, venues=None,
+                bulk=True, conn=None, price_storage=None, raise_errors=False):
     """
     Load data into PostgreSQL database.
     
     Args:
-        pg_user (str): PostgreSQL username
-        pg_password (str): PostgreSQL password
+        pg_user (str): PostgreSQL username, defaults to POSTGRESQL_USER
+        pg_password (str): PostgreSQL password, defaults to POSTGRESQL_PASSWORD
         events (DataFrame): Events data with prices
         event_details (DataFrame): Event details data
         venues (DataFrame): Venue data
+        bulk (bool): Stage with COPY and merge set-based instead of row by row
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+        price_storage (str): 'rows' or 'intervals', defaults to TICKET_TRAIL_PRICE_STORAGE or 'rows'
+        raise_errors (bool): Re-raise load errors after rolling back instead of only printing them
     """
+    # Check if DataFrames are empty
+    if events is None and event_details is None and venues is None:
+        print('No data to load')
+        return
+
+    price_storage = price_storage or os.getenv('TICKET_TRAIL_PRICE_STORAGE', 'rows')
+    if price_storage not in PRICE_STORAGE_MODES:
+        raise ValueError(f"price_storage must be one of {PRICE_STORAGE_MODES}, got {price_storage!r}")
+
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Create database connection
-        conn = psycopg2.connect(
-            host=os.getenv('POSTGRESQL_HOST'),
-            database="ticket_trail_db",
-            user=pg_user,
-            password=pg_password
-        )
-        cursor = conn.cursor()
-
-        # Check if DataFrames are empty
-        if events is None and event_details is None and venues is None:
-            print('No data to load')
-            return
-
-        # Load data into the `events` table
-        if events is not None:
-            print('Loading events')
-            for _, row in events.iterrows():
-                # Check if we already have this price for this event on this date
-                cursor.execute("""
-                    SELECT 1 
-                    FROM events 
-                    WHERE id = %s 
-                    AND date_scraped = %s 
-                    AND min_ticket_price = %s
-                """, (row['id'], row['date_scraped'], row['min_ticket_price']))
-                
-                # Only insert if we don't have this exact price record
-                if cursor.fetchone() is None:
-                    cursor.execute("""
-                        INSERT INTO events (id, min_ticket_price, date_scraped)
-                        VALUES (%s, %s, %s)
-                    """, (row['id'], row['min_ticket_price'], row['date_scraped']))
-                    print(f"Added new price ${row['min_ticket_price']} for event {row['id']}")
+        with get_connection(conn, pg_user, pg_password) as conn:
+            cursor = conn.cursor()
+            try:
+                if bulk:
+                    new_venues = bulk_load(cursor, events, event_details, venues, price_storage)
                 else:
-                    print(f"Skipping duplicate price for event {row['id']} on {row['date_scraped']}")
-
-        # Load data into the `event_details` table
-        if event_details is not None:
-            print('Loading event_details')
-            for _, row in event_details.iterrows():
-                cursor.execute("""
-                    INSERT INTO event_details (
-                        event_id, name, genre, event_start_date, 
-                        public_sales_start, public_sales_end, 
-                        presale_start, presale_end, tracking, last_tracked
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (event_id) 
-                    DO UPDATE SET
-                        tracking = EXCLUDED.tracking,
-                        last_tracked = EXCLUDED.last_tracked
-                """, (
-                    row['event_id'], row['name'], row['genre'], 
-                    row['event_start_date'], row['public_sales_start'], 
-                    row['public_sales_end'], row['presale_start'], 
-                    row['presale_end'], row['tracking'], row['last_tracked']
-                ))
-
-        # Load data into the `venues` table
-        if venues is not None:
-            print('Loading venues')
-            for _, row in venues.iterrows():
-                cursor.execute("""
-                    INSERT INTO venues (id, event_id, city, state, venue_name)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (id) DO NOTHING
-                """, (row['id'], row['event_id'], row['city'], row['state'], row['venue_name']))
-
-        # Commit all changes
-        conn.commit()
-        print('Successfully loaded all tables')
+                    new_venues = row_load(cursor, events, event_details, venues, price_storage)
+
+                # Commit all changes
+                conn.commit()
+                venue_cache.mark_known(new_venues)
+                _notify_price_listeners(events)
+                print('Successfully loaded all tables')
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
 
     except Exception as e:
         print(f"Error loading data: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
\ No newline at end of file
+        if raise_errors:
+            raise
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+import threading
+import time
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded mapping that evicts the least recently used key.
+
+    Args:
+        max_size (int): Entries kept before the oldest is evicted
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value=True):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._data.move_to_end(key)
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def discard_where(self, predicate):
+        """
+        Remove every key for which predicate(key) is true.
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class GenerationCache:
+    """
+    LRUCache for results computed from price history, keyed by tuples that
+    start with the event id.
+
+    Entries expire after `ttl` seconds, so loads by other processes show up,
+    and are dropped as soon as load_to_sql in this process commits new prices
+    for their event (the cache registers itself as a price listener). A result
+    computed while such a load committed is not stored: read `generation`
+    before loading and hand it to put().
+
+    Args:
+        max_size (int): Entries kept before the oldest is evicted
+        ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, max_size=10000, ttl=3600):
+        # etl.load imports this module (through venue_cache), so import it late
+        from etl.load import add_price_listener
+
+        self.ttl = ttl
+        self._cache = LRUCache(max_size=max_size)
+        self._generation = 0
+        self._lock = threading.Lock()
+        add_price_listener(self.invalidate)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        """
+        Cached value for `key`, or None if missing or expired.
+        """
+        cached = self._cache.get(key)
+        if cached is None or time.monotonic() - cached[0] >= self.ttl:
+            return None
+        return cached[1]
+
+    def put(self, key, value, generation):
+        """
+        Store `value` unless prices were invalidated since `generation` was read.
+        """
+        with self._lock:
+            if generation == self._generation:
+                self._cache.put(key, (time.monotonic(), value))
+
+    def invalidate(self, event_ids=None):
+        """
+        Drop cached entries for `event_ids`, or every entry if None.
+        """
+        with self._lock:
+            self._generation += 1
+            if event_ids is None:
+                self._cache.clear()
+                return
+            event_ids = set(event_ids)
+            self._cache.discard_where(lambda key: key[0] in event_ids)
+
+    def __len__(self):
+        return len(self._cache)
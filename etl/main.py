@@ -1,78 +1,136 @@
-from extract import search_event, track_current_events
-from transform import transform
-from load import load_to_sql
+from etl.extract import search_event, track_current_events
+from etl.transform import transform
+from etl.load import load_to_sql
+from etl.db import get_connection, close_pools
+from etl import metrics, profiling
+from etl.pipeline import run_pipeline, search_batches, tracked_batches
+from etl.onboard import onboard_file
 from dotenv import load_dotenv
+import argparse
 import os
 
-def main():
+def main_pipelined(api_key, keyword="Sabrina Carpenter"):
+    """
+    Same steps as main(), but search pages and tracked-event chunks stream
+    through transform and load concurrently instead of one stage at a time.
+    """
+    try:
+        print("\n=== Pipelined Search, Track and Load ===")
+        run_pipeline([
+            search_batches(api_key, keyword),
+            tracked_batches()
+        ])
+        print("\nPipeline finished")
+    except Exception as e:
+        print(f"\nError occurred: {str(e)}")
+    finally:
+        metrics.emit('main_pipelined')
+        close_pools()
+
+def main(pipelined=False, keyword_file=None):
     # Load environment variables
     load_dotenv()
     api_key = os.getenv('CONSUMER_KEY')
     pg_user = os.getenv('POSTGRESQL_USER')
     pg_password = os.getenv('POSTGRESQL_PASSWORD')
 
+    if pipelined:
+        main_pipelined(api_key)
+        return
+
+    if keyword_file:
+        try:
+            print("\n=== Bulk Onboarding ===")
+            with metrics.stage('onboard'):
+                onboard_file(api_key, keyword_file)
+        except Exception as e:
+            print(f"\nError occurred: {str(e)}")
+        finally:
+            metrics.emit('onboard')
+            close_pools()
+        return
+
     try:
-        # Step 1: Extract - Search for Sabrina Carpenter concert
-        print("\n=== Initial Search and Load ===")
-        print("\n--- Extracting Data ---")
-        events_df, event_details_df, venues_df = search_event(
-            key=api_key,
-            keyword="Sabrina Carpenter",
-            city=None
-        )
+        # One pooled connection is shared by every extract and load step
+        with get_connection(user=pg_user, password=pg_password) as conn:
+            # Step 1: Extract - Search for Sabrina Carpenter concert
+            print("\n=== Initial Search and Load ===")
+            print("\n--- Extracting Data ---")
+            with metrics.stage('extract'):
+                events_df, event_details_df, venues_df = search_event(
+                    key=api_key,
+                    keyword="Sabrina Carpenter",
+                    city=None
+                )
 
-        if events_df is None:
-            print("No events found!")
-            return
+            if events_df is None:
+                print("No events found!")
+                return
 
-        print(f"Found event: {event_details_df['name'].iloc[0]}")
+            print(f"Found event: {event_details_df['name'].iloc[0]}")
 
-        # Step 2: Transform
-        print("\n--- Transforming Data ---")
-        events_df, event_details_df, venues_df = transform(events_df, event_details_df, venues_df)
+            # Step 2: Transform
+            print("\n--- Transforming Data ---")
+            with metrics.stage('transform'):
+                events_df, event_details_df, venues_df = transform(events_df, event_details_df, venues_df)
 
-        # Step 3: Load
-        print("\n--- Loading Data ---")
-        load_to_sql(
-            pg_user=pg_user,
-            pg_password=pg_password,
-            events=events_df,
-            event_details=event_details_df,
-            venues=venues_df
-        )
+            # Step 3: Load
+            print("\n--- Loading Data ---")
+            with metrics.stage('load'):
+                load_to_sql(
+                    events=events_df,
+                    event_details=event_details_df,
+                    venues=venues_df,
+                    conn=conn
+                )
 
-        # Print initial details
-        print("\nInitial Event Details:")
-        print(f"Artist: {event_details_df['name'].iloc[0]}")
-        print(f"Genre: {event_details_df['genre'].iloc[0]}")
-        print(f"Event Date: {event_details_df['event_start_date'].iloc[0]}")
-        print(f"Initial Price: ${events_df['min_ticket_price'].iloc[0]}")
-        print(f"Venue: {venues_df['venue_name'].iloc[0]}, {venues_df['city'].iloc[0]}, {venues_df['state'].iloc[0]}")
+            # Print initial details
+            print("\nInitial Event Details:")
+            print(f"Artist: {event_details_df['name'].iloc[0]}")
+            print(f"Genre: {event_details_df['genre'].iloc[0]}")
+            print(f"Event Date: {event_details_df['event_start_date'].iloc[0]}")
+            print(f"Initial Price: ${events_df['min_ticket_price'].iloc[0]}")
+            print(f"Venue: {venues_df['venue_name'].iloc[0]}, {venues_df['city'].iloc[0]}, {venues_df['state'].iloc[0]}")
 
-        # Step 4: Track Prices and Load Updates
-        print("\n=== Testing Price Tracking ===")
-        print("Checking tracked events...")
+            # Step 4: Track Prices and Load Updates
+            print("\n=== Testing Price Tracking ===")
+            print("Checking tracked events...")
         
-        tracked_events_df, tracked_details_df = track_current_events()
+            with metrics.stage('track'):
+                tracked_events_df, tracked_details_df = track_current_events(conn=conn)
         
-        if tracked_events_df is not None and not tracked_details_df.empty:
-            # Load both price updates and tracking status updates
-            print("\n--- Loading Updates ---")
-            load_to_sql(
-                pg_user=pg_user,
-                pg_password=pg_password,
-                events=tracked_events_df,        # New prices
-                event_details=tracked_details_df, # Updated tracking status
-                venues=None                      # No venue updates needed
-            )
-        else:
-            print("\nNo events were tracked. This might mean:")
-            print("1. No events are marked for tracking in the database")
-            print("2. All tracked events have passed")
-            print("3. There was an error getting the updated prices")
+            if tracked_events_df is not None and not tracked_details_df.empty:
+                # Load both price updates and tracking status updates
+                print("\n--- Loading Updates ---")
+                with metrics.stage('load_updates'):
+                    load_to_sql(
+                        events=tracked_events_df,        # New prices
+                        event_details=tracked_details_df, # Updated tracking status
+                        venues=None,                     # No venue updates needed
+                        conn=conn
+                    )
+            else:
+                print("\nNo events were tracked. This might mean:")
+                print("1. No events are marked for tracking in the database")
+                print("2. All tracked events have passed")
+                print("3. There was an error getting the updated prices")
 
     except Exception as e:
         print(f"\nError occurred: {str(e)}")
+    finally:
+        metrics.emit('main')
+        close_pools()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Search, track and load ticket prices')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Overlap API calls, transforms and database writes')
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help='Write cProfile and allocation reports for each stage '
+                             '(to DIR, default TICKET_TRAIL_PROFILE_DIR or ./profiles)')
+    parser.add_argument('--keywords', metavar='FILE',
+                        help='Onboard every "keyword[,city]" line in FILE instead of the default search')
+    args = parser.parse_args()
+    if args.profile is not None:
+        profiling.enable(directory=args.profile or None)
+    main(pipelined=args.pipelined, keyword_file=args.keywords)
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Run metrics for the ETL: stage wall time, API calls and latency per endpoint,
+rows written per table and database round trips.
+
+Everything is collected in process-wide counters. At the end of a run (or an
+Airflow task) emit() prints one JSON log line and, when TICKET_TRAIL_METRICS_DIR
+is set, writes a Prometheus textfile for node_exporter's textfile collector.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+import re
+import threading
+import time
+from etl.db import round_trip_count
+
+# Upper bounds (seconds) of the API latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ROW_ACTIONS = ('inserted', 'updated', 'skipped')
+
+_lock = threading.Lock()
+_stages = {}
+_api_calls = {}
+_api_latency = {}
+_rows = {}
+_round_trips_start = round_trip_count()
+
+_ID_SEGMENT = re.compile(r'/(events|venues|attractions|classifications)/[^/?]+\.json')
+
+def endpoint_name(url):
+    """
+    Collapse a Discovery API URL to its endpoint, e.g. '/events/{id}.json'.
+    """
+    path = url.split('?', 1)[0]
+    if '/discovery/v2' in path:
+        path = path.split('/discovery/v2', 1)[1]
+    return _ID_SEGMENT.sub(r'/\1/{id}.json', path)
+
+def reset():
+    """
+    Clear all counters, e.g. at the start of an Airflow task.
+    """
+    global _round_trips_start
+    with _lock:
+        _stages.clear()
+        _api_calls.clear()
+        _api_latency.clear()
+        _rows.clear()
+        _round_trips_start = round_trip_count()
+
+@contextmanager
+def stage(name):
+    """
+    Add the wall time of the `with` block to stage `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stages[name] = _stages.get(name, 0.0) + elapsed
+
+def record_api_call(url, seconds, status):
+    """
+    Count one HTTP request and add its latency to the endpoint's histogram.
+
+    Args:
+        url (str): Requested URL
+        seconds (float): Time until the response (or error) arrived
+        status: HTTP status code, or 'error' for connection failures and timeouts
+    """
+    endpoint = endpoint_name(url)
+    with _lock:
+        key = (endpoint, str(status))
+        _api_calls[key] = _api_calls.get(key, 0) + 1
+
+        histogram = _api_latency.get(endpoint)
+        if histogram is None:
+            histogram = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+            _api_latency[endpoint] = histogram
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][i] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+
+def record_rows(table, inserted=0, updated=0, skipped=0):
+    """
+    Add row counts for a table written by a load.
+    """
+    with _lock:
+        counts = _rows.setdefault(table, dict.fromkeys(ROW_ACTIONS, 0))
+        counts['inserted'] += inserted
+        counts['updated'] += updated
+        counts['skipped'] += skipped
+
+def snapshot():
+    """
+    Current counters as a JSON-serialisable dict.
+    """
+    with _lock:
+        api = {}
+        for (endpoint, status), count in _api_calls.items():
+            api.setdefault(endpoint, {'calls': {}})['calls'][status] = count
+        for endpoint, histogram in _api_latency.items():
+            entry = api.setdefault(endpoint, {'calls': {}})
+            entry['latency_seconds'] = {
+                'buckets': dict(zip(map(str, LATENCY_BUCKETS), histogram['buckets'])),
+                'sum': round(histogram['sum'], 6),
+                'count': histogram['count']
+            }
+        return {
+            'stages_seconds': {name: round(seconds, 6) for name, seconds in _stages.items()},
+            'api': api,
+            'rows': {table: dict(counts) for table, counts in _rows.items()},
+            'db_round_trips': round_trip_count() - _round_trips_start
+        }
+
+def _labels(labels):
+    return ','.join(f'{key}="{str(value)}"' for key, value in labels.items())
+
+def prometheus_text(job, labels=None):
+    """
+    Render the counters in the Prometheus text exposition format.
+
+    Args:
+        job (str): Value of the `job` label on every sample
+        labels (dict): Extra labels on every sample, e.g. {'shard': 0}
+    """
+    base = {'job': job, **(labels or {})}
+    data = snapshot()
+    lines = [
+        '# HELP ticket_trail_stage_seconds Wall time spent in each ETL stage',
+        '# TYPE ticket_trail_stage_seconds gauge',
+    ]
+    for name, seconds in data['stages_seconds'].items():
+        lines.append(f'ticket_trail_stage_seconds{{{_labels({**base, "stage": name})}}} {seconds}')
+
+    lines += [
+        '# HELP ticket_trail_api_calls_total Ticketmaster API requests by endpoint and status',
+        '# TYPE ticket_trail_api_calls_total counter',
+    ]
+    for endpoint, entry in data['api'].items():
+        for status, count in entry['calls'].items():
+            sample = _labels({**base, 'endpoint': endpoint, 'status': status})
+            lines.append(f'ticket_trail_api_calls_total{{{sample}}} {count}')
+
+    lines += [
+        '# HELP ticket_trail_api_request_seconds Ticketmaster API request latency',
+        '# TYPE ticket_trail_api_request_seconds histogram',
+    ]
+    for endpoint, entry in data['api'].items():
+        histogram = entry.get('latency_seconds')
+        if histogram is None:
+            continue
+        endpoint_labels = {**base, 'endpoint': endpoint}
+        for bound, count in histogram['buckets'].items():
+            sample = _labels({**endpoint_labels, 'le': bound})
+            lines.append(f'ticket_trail_api_request_seconds_bucket{{{sample}}} {count}')
+        sample = _labels({**endpoint_labels, 'le': '+Inf'})
+        lines.append(f'ticket_trail_api_request_seconds_bucket{{{sample}}} {histogram["count"]}')
+        lines.append(f'ticket_trail_api_request_seconds_sum{{{_labels(endpoint_labels)}}} {histogram["sum"]}')
+        lines.append(f'ticket_trail_api_request_seconds_count{{{_labels(endpoint_labels)}}} {histogram["count"]}')
+
+    lines += [
+        '# HELP ticket_trail_rows_total Rows written by loads, by table and action',
+        '# TYPE ticket_trail_rows_total counter',
+    ]
+    for table, counts in data['rows'].items():
+        for action, count in counts.items():
+            sample = _labels({**base, 'table': table, 'action': action})
+            lines.append(f'ticket_trail_rows_total{{{sample}}} {count}')
+
+    lines += [
+        '# HELP ticket_trail_db_round_trips_total Statements sent to PostgreSQL',
+        '# TYPE ticket_trail_db_round_trips_total counter',
+        f'ticket_trail_db_round_trips_total{{{_labels(base)}}} {data["db_round_trips"]}',
+        '# HELP ticket_trail_last_run_timestamp_seconds When these metrics were written',
+        '# TYPE ticket_trail_last_run_timestamp_seconds gauge',
+        f'ticket_trail_last_run_timestamp_seconds{{{_labels(base)}}} {time.time()}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+def emit(job, labels=None, directory=None):
+    """
+    Print the run's metrics as one JSON log line and write a Prometheus textfile.
+
+    Args:
+        job (str): Name of the run or task, e.g. 'main' or 'extract_task'
+        labels (dict): Extra labels, e.g. {'shard': 0}
+        directory (str): Textfile directory, defaults to TICKET_TRAIL_METRICS_DIR.
+            No textfile is written if neither is set.
+
+    Returns:
+        str: Path of the textfile written, or None
+    """
+    labels = labels or {}
+    record = {
+        'event': 'etl_metrics',
+        'job': job,
+        **labels,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        **snapshot()
+    }
+    print(json.dumps(record, default=str))
+
+    directory = directory or os.getenv('TICKET_TRAIL_METRICS_DIR')
+    if not directory:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    suffix = ''.join(f'_{key}{value}' for key, value in labels.items())
+    path = os.path.join(directory, f'ticket_trail_{job}{suffix}.prom')
+    # Write then rename so the collector never reads a half-written file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text(job, labels))
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,354 @@
+"""
+Versioned, non-destructive schema migrations for ticket_trail_db.
+
+Each migration runs once, in its own transaction, and is recorded in
+schema_migrations. Run with `python -m etl.migrate`.
+"""
+
+from datetime import date
+from etl import venue_cache
+from etl.db import get_connection
+
+def month_start(value):
+    """
+    First day of the month containing `value` (a date or 'YYYY-MM-DD' string).
+    """
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return value.replace(day=1)
+
+def next_month(value):
+    """
+    First day of the month after `value`.
+    """
+    value = month_start(value)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+def partition_name(start):
+    return f"events_y{start.year}m{start.month:02d}"
+
+def ensure_event_partitions(cursor, dates):
+    """
+    Create the monthly `events` partitions covering `dates` if they don't exist yet.
+
+    Creation is serialized with a transaction-scoped advisory lock, so parallel
+    loads that both need a new month don't race (the loser would fail its whole
+    transaction). Rows for the month already in events_default are moved into
+    the new partition.
+
+    Args:
+        cursor: psycopg2 cursor
+        dates (iterable): Dates (or 'YYYY-MM-DD' strings) that will be inserted
+    """
+    months = sorted({month_start(d) for d in dates if d is not None})
+    cursor.execute(
+        "SELECT to_regclass(name) IS NULL FROM unnest(%s::text[]) AS name",
+        ([partition_name(start) for start in months],)
+    )
+    missing = [start for start, (is_missing,) in zip(months, cursor.fetchall()) if is_missing]
+    if not missing:
+        return
+
+    # Held until the caller's transaction ends; re-check once we have it
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext('events_partitions'))")
+    for start in missing:
+        name = partition_name(start)
+        cursor.execute("SELECT to_regclass(%s), to_regclass('events_default')", (name,))
+        exists, default = cursor.fetchone()
+        if exists is not None:
+            continue
+
+        cursor.execute(f"CREATE TABLE {name} (LIKE events INCLUDING DEFAULTS)")
+        if default is not None:
+            cursor.execute(f"""
+                WITH moved AS (
+                    DELETE FROM events_default
+                    WHERE date_scraped >= %s AND date_scraped < %s
+                    RETURNING id, min_ticket_price, date_scraped
+                )
+                INSERT INTO {name} (id, min_ticket_price, date_scraped)
+                SELECT id, min_ticket_price, date_scraped FROM moved
+            """, (start, next_month(start)))
+        cursor.execute(f"""
+            ALTER TABLE events ATTACH PARTITION {name}
+            FOR VALUES FROM (%s) TO (%s)
+        """, (start, next_month(start)))
+
+def _create_base_tables(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events
+        (
+            id VARCHAR(50), 
+            min_ticket_price FLOAT,
+            date_scraped DATE
+        );
+
+        CREATE TABLE IF NOT EXISTS event_details
+        (
+            id SERIAL,
+            event_id VARCHAR(50) PRIMARY KEY, 
+            name VARCHAR(100),
+            genre VARCHAR(50),
+            event_start_date DATE,
+            public_sales_start DATE,
+            public_sales_end DATE,
+            presale_start DATE,
+            presale_end DATE,
+            tracking INT,
+            last_tracked DATE
+        );
+
+        CREATE TABLE IF NOT EXISTS venues
+        (
+            id VARCHAR(50) PRIMARY KEY,
+            event_id VARCHAR(50),
+            city VARCHAR(50),
+            state VARCHAR(2),
+            venue_name VARCHAR(100)
+        );
+    """)
+
+def _partition_events(cursor):
+    # Rebuild events as a table range-partitioned by month. The unique
+    # constraint includes the partition key, leads with (id, date_scraped)
+    # so it also serves price-history lookups, and replaces the duplicate check.
+    cursor.execute("ALTER TABLE events RENAME TO events_unpartitioned")
+    cursor.execute("""
+        CREATE TABLE events
+        (
+            id VARCHAR(50) NOT NULL, 
+            min_ticket_price FLOAT,
+            date_scraped DATE NOT NULL,
+            CONSTRAINT events_id_date_price_key UNIQUE (id, date_scraped, min_ticket_price)
+        ) PARTITION BY RANGE (date_scraped)
+    """)
+
+    cursor.execute("""
+        SELECT DISTINCT date_trunc('month', date_scraped)::date
+        FROM events_unpartitioned
+        WHERE date_scraped IS NOT NULL
+    """)
+    existing_months = [row[0] for row in cursor.fetchall()]
+    today = date.today()
+    ensure_event_partitions(cursor, existing_months + [today, next_month(today)])
+
+    cursor.execute("""
+        INSERT INTO events (id, min_ticket_price, date_scraped)
+        SELECT id, min_ticket_price, date_scraped
+        FROM events_unpartitioned
+        WHERE id IS NOT NULL AND date_scraped IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+    cursor.execute("DROP TABLE events_unpartitioned")
+
+def _create_price_rollups(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_price_daily
+        (
+            event_id VARCHAR(50) NOT NULL,
+            day DATE NOT NULL,
+            min_price FLOAT,
+            last_price FLOAT,
+            price_change FLOAT,
+            PRIMARY KEY (event_id, day)
+        );
+
+        CREATE TABLE IF NOT EXISTS event_price_summary
+        (
+            event_id VARCHAR(50) PRIMARY KEY,
+            first_seen DATE,
+            first_price FLOAT,
+            min_price FLOAT,
+            last_price FLOAT,
+            last_seen DATE
+        );
+    """)
+
+    # Backfill from existing prices. events keeps no intra-day order, so a
+    # day's lowest price stands in for its last price.
+    cursor.execute("""
+        INSERT INTO event_price_daily (event_id, day, min_price, last_price, price_change)
+        SELECT
+            id, date_scraped, min_price, min_price,
+            min_price - LAG(min_price) OVER (PARTITION BY id ORDER BY date_scraped)
+        FROM (
+            SELECT id, date_scraped, min(min_ticket_price) AS min_price
+            FROM events
+            GROUP BY id, date_scraped
+        ) daily
+        ON CONFLICT DO NOTHING
+    """)
+    cursor.execute("""
+        INSERT INTO event_price_summary (
+            event_id, first_seen, first_price, min_price, last_price, last_seen
+        )
+        SELECT
+            event_id,
+            min(day),
+            (array_agg(last_price ORDER BY day))[1],
+            min(min_price),
+            (array_agg(last_price ORDER BY day DESC))[1],
+            max(day)
+        FROM event_price_daily
+        GROUP BY event_id
+        ON CONFLICT DO NOTHING
+    """)
+
+MIGRATIONS = [
+    (1, 'create events, event_details and venues', _create_base_tables),
+    (2, 'range-partition events by month with a unique (id, date_scraped, price) key', _partition_events),
+    (3, 'partial index on tracked events', """
+        CREATE INDEX IF NOT EXISTS event_details_tracking_idx
+        ON event_details (event_start_date)
+        WHERE tracking = 1
+    """),
+    (4, 'daily and per-event price rollups', _create_price_rollups),
+    (5, 'change-only price intervals and the events_daily view', """
+        CREATE TABLE IF NOT EXISTS event_price_intervals
+        (
+            event_id VARCHAR(50) NOT NULL,
+            min_ticket_price FLOAT,
+            valid_from DATE NOT NULL,
+            valid_to DATE NOT NULL,
+            is_current BOOLEAN NOT NULL DEFAULT true,
+            PRIMARY KEY (event_id, valid_from)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS event_price_intervals_current_idx
+        ON event_price_intervals (event_id)
+        WHERE is_current;
+
+        -- Daily series in the shape of the events table, whichever storage mode wrote it
+        CREATE OR REPLACE VIEW events_daily AS
+        SELECT i.event_id AS id, i.min_ticket_price, d::date AS date_scraped
+        FROM event_price_intervals i
+        CROSS JOIN LATERAL generate_series(i.valid_from, i.valid_to, interval '1 day') AS d
+        UNION ALL
+        SELECT id, min_ticket_price, date_scraped
+        FROM events;
+    """),
+    (6, 'trigram search indexes on event and venue names', """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+        CREATE INDEX IF NOT EXISTS event_details_name_trgm_idx
+        ON event_details USING gin (name gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS event_details_genre_trgm_idx
+        ON event_details USING gin (genre gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS venues_venue_name_trgm_idx
+        ON venues USING gin (venue_name gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS venues_city_trgm_idx
+        ON venues USING gin (city gin_trgm_ops);
+    """),
+    (7, 'next_poll_at schedule for tracked events', """
+        ALTER TABLE event_details ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMP;
+
+        CREATE INDEX IF NOT EXISTS event_details_next_poll_idx
+        ON event_details (next_poll_at)
+        WHERE tracking = 1;
+    """),
+    (8, 'event_venues mapping so each venue row is written once', """
+        CREATE TABLE IF NOT EXISTS event_venues
+        (
+            event_id VARCHAR(50),
+            venue_id VARCHAR(50),
+            PRIMARY KEY (event_id, venue_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS event_venues_venue_idx ON event_venues (venue_id);
+
+        INSERT INTO event_venues (event_id, venue_id)
+        SELECT event_id, id FROM venues
+        WHERE event_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    """),
+    (9, 'failed_polls count for backing off events whose price fetch fails', """
+        ALTER TABLE event_details ADD COLUMN IF NOT EXISTS failed_polls INT NOT NULL DEFAULT 0;
+    """),
+    (10, 'daily API call counts shared across processes', """
+        CREATE TABLE IF NOT EXISTS api_quota_usage
+        (
+            key_id VARCHAR(16) NOT NULL,
+            day DATE NOT NULL,
+            calls INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (key_id, day)
+        );
+    """),
+    (11, 'index event_price_daily by day for archive exports', """
+        CREATE INDEX IF NOT EXISTS event_price_daily_day_idx ON event_price_daily (day);
+    """),
+    (12, 'store next_poll_at with its timezone', """
+        ALTER TABLE event_details ALTER COLUMN next_poll_at TYPE TIMESTAMPTZ;
+    """),
+    (13, 'default events partition for dates without a monthly partition', """
+        CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT;
+    """),
+]
+
+def migrate(conn=None):
+    """
+    Apply every migration that hasn't been recorded in schema_migrations yet.
+
+    Args:
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        list: Versions applied by this call
+    """
+    applied_now = []
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations
+                (
+                    version INT PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP DEFAULT now()
+                )
+            """)
+            conn.commit()
+
+            for version, description, migration in MIGRATIONS:
+                # Serialize concurrent runs, then re-check inside the lock
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))")
+                cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+                if cursor.fetchone() is not None:
+                    conn.commit()
+                    continue
+
+                print(f"Applying migration {version}: {description}")
+                if callable(migration):
+                    migration(cursor)
+                else:
+                    cursor.execute(migration)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                conn.commit()
+                applied_now.append(version)
+
+            # Keep a partition ready for this month and next
+            today = date.today()
+            ensure_event_partitions(cursor, [today, next_month(today)])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    if not applied_now:
+        print("Schema is up to date")
+    else:
+        # Tables may have been created or rebuilt, drop venue ids cached before
+        venue_cache.clear()
+    return applied_now
+
+if __name__ == "__main__":
+    migrate()
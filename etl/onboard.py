@@ -0,0 +1,145 @@
+"""
+Bulk onboarding: search many artists at once and load the results together.
+
+The keyword file has one search per line, `keyword[,city]`; blank lines and
+lines starting with # are ignored. Searches run concurrently through the
+shared Ticketmaster client (which keeps them within the rate limit and daily
+quota). Events and venues returned by more than one search are kept once,
+and everything is written with a single bulk load.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import csv
+import pandas as pd
+from etl.extract import search_event_pages
+from etl.load import load_to_sql
+from etl.transform import transform
+
+def read_keyword_file(path):
+    """
+    Parse a keyword file into (keyword, city) pairs, city being None if not given.
+    """
+    searches = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                continue
+            keyword = row[0].strip()
+            city = row[1].strip() if len(row) > 1 and row[1].strip() else None
+            searches.append((keyword, city))
+    # The same search listed twice only needs to run once
+    return list(dict.fromkeys(searches))
+
+def _run_search(api_key, keyword, city, page_size, max_pages):
+    return list(search_event_pages(api_key, keyword, city, page_size=page_size, max_pages=max_pages))
+
+def dedupe_pages(pages):
+    """
+    Combine search result pages, keeping each event once.
+
+    Args:
+        pages (iterable): (events_df, event_details_df, venues_df) tuples as
+            yielded by search_event_pages
+
+    Returns:
+        tuple: (events_df, event_details_df, venues_df, stats) where stats counts
+            unique and duplicate events and unique venues. venues_df keeps one row
+            per kept event so the event-venue mapping is complete; each venue id
+            is still only inserted once.
+    """
+    seen_events = set()
+    seen_venues = set()
+    duplicates = 0
+    events, details, venues = [], [], []
+
+    for events_df, details_df, venues_df in pages:
+        # parse_events builds the three frames row-aligned, one row per event
+        keep = []
+        for i, event_id in enumerate(details_df['event_id']):
+            if event_id in seen_events:
+                duplicates += 1
+                continue
+            seen_events.add(event_id)
+            keep.append(i)
+        if not keep:
+            continue
+
+        events.append(events_df.iloc[keep])
+        details.append(details_df.iloc[keep])
+        kept_venues = venues_df.iloc[keep]
+        seen_venues.update(kept_venues['id'])
+        venues.append(kept_venues)
+
+    stats = {'events': len(seen_events), 'duplicate_events': duplicates, 'venues': len(seen_venues)}
+    if not events:
+        return None, None, None, stats
+    return (
+        pd.concat(events, ignore_index=True),
+        pd.concat(details, ignore_index=True),
+        pd.concat(venues, ignore_index=True),
+        stats
+    )
+
+def onboard(api_key, searches, max_workers=8, page_size=200, max_pages=None, load=True, conn=None):
+    """
+    Search for every (keyword, city) pair concurrently, dedupe, then bulk load once.
+
+    Args:
+        api_key (str): Ticketmaster API key
+        searches (list): (keyword, city) pairs, e.g. from read_keyword_file
+        max_workers (int): Searches run in parallel
+        page_size (int): Results per search page
+        max_pages (int): Pages fetched per search, all of them if None
+        load (bool): Write the results to the database
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        dict: Counts of searches, unique events, duplicate events and unique venues
+    """
+    pages = []
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_run_search, api_key, keyword, city, page_size, max_pages): keyword
+            for keyword, city in searches
+        }
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Search for '{futures[future]}' failed: {str(e)}")
+                continue
+            if not results:
+                print(f"No events found for '{futures[future]}'")
+            pages.extend(results)
+
+    events_df, event_details_df, venues_df, stats = dedupe_pages(pages)
+    stats.update(searches=len(searches), failed_searches=failed)
+    print(
+        f"Found {stats['events']} unique events at {stats['venues']} venues across "
+        f"{len(searches)} searches, skipped {stats['duplicate_events']} duplicates"
+    )
+
+    if events_df is None or not load:
+        return stats
+
+    events_df, event_details_df, venues_df = transform(events_df, event_details_df, venues_df)
+    load_to_sql(
+        events=events_df,
+        event_details=event_details_df,
+        venues=venues_df,
+        conn=conn,
+        raise_errors=True
+    )
+    return stats
+
+def onboard_file(api_key, path, **kwargs):
+    """
+    Onboard every search listed in a keyword file. See onboard() for kwargs.
+    """
+    searches = read_keyword_file(path)
+    if not searches:
+        print(f"No searches found in {path}")
+        return None
+    return onboard(api_key, searches, **kwargs)
@@ -0,0 +1,163 @@
+"""
+Pipelined extract -> transform -> load runner.
+
+Each stage runs on its own thread and hands batches to the next through a
+bounded queue, so database writes overlap with API calls still in flight.
+A full queue blocks the stage feeding it (backpressure). If any stage fails,
+the others stop at their next queue operation and the first error is
+re-raised from run_pipeline.
+"""
+
+import queue
+import threading
+from etl import metrics
+from etl.db import get_connection
+from etl.extract import iter_tracked_events, search_event_pages
+from etl.load import load_to_sql
+from etl.transform import transform
+
+_DONE = object()
+
+class _PipelineState:
+    def __init__(self):
+        self.stop = threading.Event()
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def fail(self, stage, error):
+        with self._lock:
+            self.errors.append((stage, error))
+        self.stop.set()
+
+def _put(q, item, state):
+    # Block while the queue is full, but give up once another stage has failed
+    while not state.stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, state):
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if state.stop.is_set():
+                return _DONE
+
+def _finish(q, state):
+    # Always hand the end marker downstream, even after a failure
+    while True:
+        try:
+            q.put(_DONE, timeout=0.1)
+            return
+        except queue.Full:
+            if state.stop.is_set():
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+def _extract_stage(sources, out_q, state):
+    try:
+        for source in sources:
+            batches = iter(source)
+            while True:
+                # Only time spent producing a batch counts, not waiting on the queue
+                with metrics.stage('extract'):
+                    batch = next(batches, _DONE)
+                if batch is _DONE:
+                    break
+                if not _put(out_q, batch, state):
+                    return
+    except Exception as e:
+        state.fail('extract', e)
+    finally:
+        _finish(out_q, state)
+
+def _transform_stage(in_q, out_q, state):
+    try:
+        while True:
+            batch = _get(in_q, state)
+            if batch is _DONE:
+                return
+            with metrics.stage('transform'):
+                events, event_details, venues = transform(
+                    batch.get('events'), batch.get('event_details'), batch.get('venues')
+                )
+            if event_details is None and batch.get('event_details') is not None:
+                raise RuntimeError('transform failed, see log above')
+            transformed = {'events': events, 'event_details': event_details, 'venues': venues}
+            if not _put(out_q, transformed, state):
+                return
+    except Exception as e:
+        state.fail('transform', e)
+    finally:
+        _finish(out_q, state)
+
+def _load_stage(in_q, state, load_kwargs):
+    try:
+        # The load stage keeps one pooled connection for the whole run
+        with get_connection() as conn:
+            while True:
+                batch = _get(in_q, state)
+                if batch is _DONE:
+                    return
+                with metrics.stage('load'):
+                    load_to_sql(
+                        events=batch['events'],
+                        event_details=batch['event_details'],
+                        venues=batch['venues'],
+                        conn=conn,
+                        raise_errors=True,
+                        **load_kwargs
+                    )
+    except Exception as e:
+        state.fail('load', e)
+
+def run_pipeline(sources, queue_size=4, **load_kwargs):
+    """
+    Stream batches from `sources` through transform and load concurrently.
+
+    Args:
+        sources (list): Iterables yielding dicts with 'events', 'event_details'
+            and 'venues' DataFrames (any may be None). Consumed in order.
+        queue_size (int): Batches allowed to wait between two stages
+        **load_kwargs: Passed through to load_to_sql (e.g. bulk, price_storage)
+
+    Raises:
+        RuntimeError: A stage failed; the original exception is chained
+    """
+    state = _PipelineState()
+    extracted = queue.Queue(maxsize=queue_size)
+    transformed = queue.Queue(maxsize=queue_size)
+
+    threads = [
+        threading.Thread(target=_extract_stage, args=(sources, extracted, state), name='extract'),
+        threading.Thread(target=_transform_stage, args=(extracted, transformed, state), name='transform'),
+        threading.Thread(target=_load_stage, args=(transformed, state, load_kwargs), name='load'),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if state.errors:
+        stage, error = state.errors[0]
+        raise RuntimeError(f"Pipeline stage '{stage}' failed: {error}") from error
+
+def search_batches(api_key, keyword, city=None, **kwargs):
+    """
+    Source of search result batches, one per results page.
+    """
+    for events_df, event_details_df, venues_df in search_event_pages(api_key, keyword, city, **kwargs):
+        yield {'events': events_df, 'event_details': event_details_df, 'venues': venues_df}
+
+def tracked_batches(chunk_size=500, **kwargs):
+    """
+    Source of price refresh batches for tracked events, one per chunk.
+    """
+    for events_df, event_details_df in iter_tracked_events(chunk_size=chunk_size, **kwargs):
+        yield {'events': events_df, 'event_details': event_details_df, 'venues': None}
@@ -0,0 +1,131 @@
+"""
+Read side for price history.
+
+load_to_sql keeps two rollups current as it writes prices:
+    event_price_daily    one row per event per day (min, last, change vs previous day)
+    event_price_summary  one row per event (first seen, min, latest)
+so page loads are single primary-key lookups instead of aggregations over events.
+"""
+
+import pandas as pd
+from etl.db import get_connection
+
+def refresh_price_rollups(cursor, source):
+    """
+    Fold newly loaded prices into event_price_daily and event_price_summary.
+
+    Args:
+        cursor: psycopg2 cursor inside the load transaction
+        source (str): Table or staging table with id, min_ticket_price, date_scraped columns
+    """
+    cursor.execute(f"""
+        CREATE TEMP TABLE price_rollup_incoming ON COMMIT DROP AS
+        SELECT id AS event_id, date_scraped AS day, min(min_ticket_price) AS price
+        FROM {source}
+        WHERE id IS NOT NULL AND date_scraped IS NOT NULL
+        GROUP BY id, date_scraped
+    """)
+
+    cursor.execute("""
+        INSERT INTO event_price_daily AS d (event_id, day, min_price, last_price, price_change)
+        SELECT
+            i.event_id, i.day, i.price, i.price,
+            i.price - COALESCE(
+                LAG(i.price) OVER (PARTITION BY i.event_id ORDER BY i.day),
+                (
+                    SELECT p.last_price
+                    FROM event_price_daily p
+                    WHERE p.event_id = i.event_id AND p.day < i.day
+                    ORDER BY p.day DESC
+                    LIMIT 1
+                )
+            )
+        FROM price_rollup_incoming i
+        ORDER BY i.event_id, i.day
+        ON CONFLICT (event_id, day) DO UPDATE SET
+            min_price = LEAST(d.min_price, EXCLUDED.min_price),
+            last_price = EXCLUDED.last_price,
+            price_change = EXCLUDED.price_change
+    """)
+
+    cursor.execute("""
+        INSERT INTO event_price_summary AS s (
+            event_id, first_seen, first_price, min_price, last_price, last_seen
+        )
+        SELECT
+            event_id,
+            min(day),
+            (array_agg(price ORDER BY day))[1],
+            min(price),
+            (array_agg(price ORDER BY day DESC))[1],
+            max(day)
+        FROM price_rollup_incoming
+        GROUP BY event_id
+        ON CONFLICT (event_id) DO UPDATE SET
+            first_price = CASE WHEN EXCLUDED.first_seen < s.first_seen
+                               THEN EXCLUDED.first_price ELSE s.first_price END,
+            first_seen = LEAST(s.first_seen, EXCLUDED.first_seen),
+            min_price = LEAST(s.min_price, EXCLUDED.min_price),
+            last_price = CASE WHEN EXCLUDED.last_seen >= s.last_seen
+                              THEN EXCLUDED.last_price ELSE s.last_price END,
+            last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen)
+    """)
+
+    cursor.execute("DROP TABLE price_rollup_incoming")
+
+def get_price_history(event_id, start=None, end=None, conn=None):
+    """
+    Daily price history for one event.
+
+    Args:
+        event_id (str): Ticketmaster event id
+        start (date): First day to include
+        end (date): Last day to include
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        DataFrame: day, min_price, last_price, price_change ordered by day
+    """
+    query = """
+        SELECT day, min_price, last_price, price_change
+        FROM event_price_daily
+        WHERE event_id = %s
+        AND (%s::date IS NULL OR day >= %s::date)
+        AND (%s::date IS NULL OR day <= %s::date)
+        ORDER BY day
+    """
+    with get_connection(conn) as conn:
+        return pd.read_sql(query, con=conn, params=(event_id, start, start, end, end))
+
+def get_price_summary(event_ids, conn=None):
+    """
+    First-seen, minimum and latest price for many events in one lookup.
+
+    Returns:
+        DataFrame: event_id, first_seen, first_price, min_price, last_price, last_seen
+    """
+    query = """
+        SELECT event_id, first_seen, first_price, min_price, last_price, last_seen
+        FROM event_price_summary
+        WHERE event_id = ANY(%s)
+    """
+    with get_connection(conn) as conn:
+        return pd.read_sql(query, con=conn, params=(list(event_ids),))
+
+def get_latest_prices(event_ids, conn=None):
+    """
+    Most recent price for each event.
+
+    Returns:
+        DataFrame: event_id, last_price, last_seen
+    """
+    return get_price_summary(event_ids, conn)[['event_id', 'last_price', 'last_seen']]
+
+def get_min_prices(event_ids, conn=None):
+    """
+    Lowest price ever seen for each event.
+
+    Returns:
+        DataFrame: event_id, min_price
+    """
+    return get_price_summary(event_ids, conn)[['event_id', 'min_price']]
@@ -0,0 +1,126 @@
+"""
+Opt-in profiling of the ETL stages.
+
+Set TICKET_TRAIL_PROFILE=1 (or pass --profile on the command line) and every
+call to a function decorated with @profiled writes:
+
+- {stage}-{n}.pstats: cProfile stats, open with `python -m pstats` or snakeviz
+- {stage}-{n}.alloc.txt: the top allocation sites (tracemalloc) during the call
+
+to TICKET_TRAIL_PROFILE_DIR (default ./profiles), in one subdirectory per run.
+When profiling is off the decorator only checks a flag and calls through.
+"""
+
+from datetime import datetime
+import cProfile
+import functools
+import os
+import threading
+import tracemalloc
+
+DEFAULT_PROFILE_DIR = 'profiles'
+DEFAULT_TOP_N = 25
+
+_settings = {'enabled': None, 'directory': None, 'top_n': DEFAULT_TOP_N}
+_run_dir = None
+_call_counts = {}
+_tracing_users = 0
+# Whether tracemalloc was started by us, so a caller's own tracing is left running
+_started_tracing = False
+_lock = threading.Lock()
+# Only one cProfile profiler can run at a time; concurrent stages (e.g. the
+# pipeline threads) still get allocation reports
+_profiler_lock = threading.Lock()
+
+def enable(directory=None, top_n=DEFAULT_TOP_N):
+    """
+    Turn profiling on for this process, e.g. from a --profile CLI flag.
+
+    Args:
+        directory (str): Where run directories are created, defaults to
+            TICKET_TRAIL_PROFILE_DIR or ./profiles
+        top_n (int): Allocation sites listed per report
+    """
+    _settings.update(enabled=True, directory=directory, top_n=top_n)
+
+def disable():
+    _settings['enabled'] = False
+
+def is_enabled():
+    if _settings['enabled'] is None:
+        return os.getenv('TICKET_TRAIL_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+    return _settings['enabled']
+
+def run_dir():
+    """
+    Output directory for this run, created on first use.
+    """
+    global _run_dir
+    with _lock:
+        if _run_dir is None:
+            base = _settings['directory'] or os.getenv('TICKET_TRAIL_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+            _run_dir = os.path.join(base, datetime.now().strftime('%Y%m%dT%H%M%S') + f'-{os.getpid()}')
+            os.makedirs(_run_dir, exist_ok=True)
+        return _run_dir
+
+def _next_path(stage):
+    with _lock:
+        n = _call_counts.get(stage, 0) + 1
+        _call_counts[stage] = n
+    return os.path.join(run_dir(), f'{stage}-{n}')
+
+def _start_tracing():
+    global _tracing_users, _started_tracing
+    with _lock:
+        if _tracing_users == 0:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+        _tracing_users += 1
+
+def _stop_tracing():
+    global _tracing_users, _started_tracing
+    with _lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+def _write_allocations(path, before, after, top_n):
+    stats = after.compare_to(before, 'lineno')
+    current, peak = tracemalloc.get_traced_memory()
+    with open(path, 'w') as f:
+        f.write(f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n")
+        f.write(f"Top {top_n} allocation sites during the call:\n")
+        for stat in stats[:top_n]:
+            f.write(f"{stat}\n")
+
+def profiled(stage):
+    """
+    Decorator that profiles each call of the wrapped function as `stage`
+    while profiling is enabled.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+
+            path = _next_path(stage)
+            _start_tracing()
+            before = tracemalloc.take_snapshot()
+
+            profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+            try:
+                if profiler is None:
+                    return func(*args, **kwargs)
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                if profiler is not None:
+                    _profiler_lock.release()
+                    profiler.dump_stats(f'{path}.pstats')
+                _write_allocations(f'{path}.alloc.txt', before, tracemalloc.take_snapshot(), _settings['top_n'])
+                _stop_tracing()
+                print(f"Profile for {stage} written to {path}.*")
+        return wrapper
+    return decorator
@@ -0,0 +1,115 @@
+"""
+Adaptive polling schedule for tracked events.
+
+Each tracked event gets a next_poll_at time. Events whose presale or public
+on-sale is close, events that are coming up soon, and events whose price has
+been moving are polled more often; shows months away are polled every few
+days. track_current_events only fetches events that are due.
+
+Events whose price couldn't be fetched (gone, 404, no price listed) are
+retried after MIN_POLL_HOURS, doubling with each consecutive failure up to
+RETRY_MAX_HOURS, so they don't crowd out events that are actually due.
+"""
+
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Poll interval (hours) by days until the event starts
+POLL_HOURS_BY_DAYS_OUT = [(7, 6), (30, 12), (90, 24)]
+DEFAULT_POLL_HOURS = 72
+# Presale / public on-sale within this window of now
+SALE_WINDOW = pd.Timedelta(days=2)
+SALE_WINDOW_POLL_HOURS = 4
+# Share of recent days with a price change above which the interval is halved
+VOLATILE_CHANGE_RATE = 0.2
+VOLATILITY_LOOKBACK_DAYS = 14
+MIN_POLL_HOURS = 2
+# Longest wait between retries of an event whose price keeps failing
+RETRY_MAX_HOURS = DEFAULT_POLL_HOURS
+
+def load_volatility(conn, event_ids):
+    """
+    Share of recent days on which each event's price changed, from event_price_daily.
+
+    Returns:
+        dict: event_id -> change rate between 0 and 1 (events without history are left out)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT event_id, avg((price_change <> 0)::int)::float
+        FROM event_price_daily
+        WHERE event_id = ANY(%s)
+        AND day >= current_date - %s
+        AND price_change IS NOT NULL
+        GROUP BY event_id
+    """, (list(event_ids), VOLATILITY_LOOKBACK_DAYS))
+    volatility = dict(cursor.fetchall())
+    cursor.close()
+    return volatility
+
+def _utc_now(now=None):
+    # next_poll_at is a TIMESTAMPTZ compared with the database's now(), so work in
+    # UTC whatever the local timezone; a naive `now` is taken to be UTC
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    return now.tz_localize('UTC') if now.tzinfo is None else now.tz_convert('UTC')
+
+def compute_next_poll(event_details_df, now=None, volatility=None):
+    """
+    Work out when each event should next be polled.
+
+    Args:
+        event_details_df (DataFrame): Rows shaped like event_details
+        now (datetime): Reference time, defaults to now
+        volatility (dict): event_id -> recent price change rate (see load_volatility)
+
+    Returns:
+        Series: next_poll_at per row as a UTC datetime, None for events no longer tracked
+    """
+    now = _utc_now(now)
+    # Event and sale dates are stored without a timezone
+    naive_now = now.tz_localize(None)
+
+    days_to_event = (pd.to_datetime(event_details_df['event_start_date']) - naive_now) / pd.Timedelta(days=1)
+    hours = np.select(
+        [days_to_event <= days for days, _ in POLL_HOURS_BY_DAYS_OUT],
+        [poll_hours for _, poll_hours in POLL_HOURS_BY_DAYS_OUT],
+        default=DEFAULT_POLL_HOURS
+    ).astype(float)
+
+    # Prices move most around presale and public on-sale
+    for column in ('presale_start', 'public_sales_start'):
+        near_sale = ((pd.to_datetime(event_details_df[column]) - naive_now).abs() <= SALE_WINDOW).to_numpy()
+        hours = np.where(near_sale, np.minimum(hours, SALE_WINDOW_POLL_HOURS), hours)
+
+    if volatility:
+        change_rate = event_details_df['event_id'].map(volatility).fillna(0).to_numpy()
+        hours = np.where(change_rate >= VOLATILE_CHANGE_RATE, hours / 2, hours)
+
+    hours = np.maximum(hours, MIN_POLL_HOURS)
+    next_poll = now + pd.to_timedelta(hours, unit='h')
+    tracked = (event_details_df['tracking'] == 1).to_numpy()
+
+    return pd.Series(
+        [ts.to_pydatetime() if is_tracked else None for ts, is_tracked in zip(next_poll, tracked)],
+        index=event_details_df.index,
+        dtype=object
+    )
+
+def compute_retry_poll(failed_polls, now=None):
+    """
+    Back off events whose price fetch failed.
+
+    Args:
+        failed_polls (Series): Consecutive failed fetches per event, including this one
+        now (datetime): Reference time, defaults to now
+
+    Returns:
+        Series: next_poll_at per row as a UTC datetime, MIN_POLL_HOURS after now
+            for the first failure and doubling per failure up to RETRY_MAX_HOURS
+    """
+    now = _utc_now(now)
+    exponent = np.clip(failed_polls.to_numpy(dtype=float) - 1, 0, None)
+    hours = np.minimum(MIN_POLL_HOURS * np.exp2(exponent), RETRY_MAX_HOURS)
+    next_poll = now + pd.to_timedelta(hours, unit='h')
+    return pd.Series([ts.to_pydatetime() for ts in next_poll], index=failed_polls.index, dtype=object)
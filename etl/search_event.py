@@ -1,54 +1,71 @@
 from dotenv import load_dotenv
 import os
-import requests
+from etl.client import get_client
 import json
 
-# Load in API keys
-load_dotenv()
-
-api_key = os.getenv('CONSUMER_KEY')
-api_url_events_search = 'https://app.ticketmaster.com/discovery/v2/events.json'
-
-# Specify params
-keyword = 'Tyler The Creator'
-params = {
-    "apikey" : api_key,
-    "keyword" : keyword,
-    "countryCode" : "US",
-    "size" : 5
-}
-
-# Make the GET request
-response = requests.get(api_url_events_search, params=params)
-
-# Process the response
-try:
-    if response.status_code == 200:
-        # Parse the JSON response
-        data = response.json()
-        # Check if events are returned in the response
-        if "_embedded" in data and "events" in data["_embedded"]:
-            events = data["_embedded"]["events"]
-
-            # Loop through each event and display details
-            print("Events Found:")
-            for event in events:
-                event_name = event.get("name", "Unknown Event Name")
-                event_date = event["dates"]["start"].get("localDate", "Unknown Date")
-                venue_name = event["_embedded"]["venues"][0].get("name", "Unknown Venue")
-                city = event["_embedded"]["venues"][0]["city"].get("name", "Unknown City")
-                state = event["_embedded"]["venues"][0]["state"].get("stateCode", "Unknown State")
-
-                print(f"Event Name: {event_name}")
-                print(f"Date: {event_date}")
-                print(f"Venue: {venue_name}")
-                print(f"City: {city}, {state}")
-                print("-" * 30)
-        else:
-            print("No events found for the given keyword.")
-    else:
+def find_events(api_key, keyword, size=5, city=None):
+    """
+    Search the Discovery API and summarise the matching events, optionally in one city.
+
+    Returns:
+        list: One dict per event with name, date, venue, city and state,
+            or None if the request failed
+    """
+    # Specify params
+    params = {
+        "apikey" : api_key,
+        "keyword" : keyword,
+        "countryCode" : "US",
+        "city" : city,
+        "size" : size
+    }
+
+    # Make the GET request
+    response = get_client(api_key).get('/events.json', params=params)
+    if response.status_code != 200:
         print(f"API call failed with status code: {response.status_code}")
-except Exception as e:
-    print("An error occurred:", e)
+        return None
+
+    # Parse the JSON response
+    data = response.json()
+    # Check if events are returned in the response
+    if "_embedded" not in data or "events" not in data["_embedded"]:
+        return []
+
+    found = []
+    for event in data["_embedded"]["events"]:
+        venue = event["_embedded"]["venues"][0]
+        found.append({
+            "name": event.get("name", "Unknown Event Name"),
+            "date": event["dates"]["start"].get("localDate", "Unknown Date"),
+            "venue": venue.get("name", "Unknown Venue"),
+            "city": venue["city"].get("name", "Unknown City"),
+            "state": venue["state"].get("stateCode", "Unknown State")
+        })
+    return found
+
+def print_events(events):
+    if not events:
+        print("No events found for the given keyword.")
+        return
+
+    # Loop through each event and display details
+    print("Events Found:")
+    for event in events:
+        print(f"Event Name: {event['name']}")
+        print(f"Date: {event['date']}")
+        print(f"Venue: {event['venue']}")
+        print(f"City: {event['city']}, {event['state']}")
+        print("-" * 30)
 
+if __name__ == "__main__":
+    # Load in API keys
+    load_dotenv()
+    api_key = os.getenv('CONSUMER_KEY')
 
+    try:
+        events = find_events(api_key, 'Tyler The Creator')
+        if events is not None:
+            print_events(events)
+    except Exception as e:
+        print("An error occurred:", e)
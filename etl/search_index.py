@@ -0,0 +1,79 @@
+"""
+Local keyword search over stored events, for the search box.
+
+Backed by pg_trgm GIN indexes on event_details (name, genre) and venues
+(venue_name, city), created by migration 6. Postgres keeps the indexes up
+to date as load_to_sql writes, so there is nothing to rebuild and no API
+quota is used.
+"""
+
+import pandas as pd
+from etl.db import get_connection
+
+def _like_pattern(query):
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def search_events(query, limit=20, tracking_only=True, conn=None):
+    """
+    Find stored events whose name, genre, venue or city matches `query`.
+
+    Substring / prefix matches and fuzzy (trigram word similarity) matches are
+    both returned, best match first.
+
+    Args:
+        query (str): Text typed into the search box
+        limit (int): Maximum number of results
+        tracking_only (bool): Only return events that are still being tracked
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        DataFrame: event_id, name, genre, event_start_date, venue_name, city, state, score
+    """
+    query = (query or '').strip()
+    if not query:
+        return pd.DataFrame(columns=[
+            'event_id', 'name', 'genre', 'event_start_date',
+            'venue_name', 'city', 'state', 'score'
+        ])
+
+    sql = """
+        WITH matches AS (
+            SELECT event_id
+            FROM event_details
+            WHERE name ILIKE %(pattern)s OR %(q)s <%% name
+            OR genre ILIKE %(pattern)s OR %(q)s <%% genre
+            UNION
+            SELECT ev.event_id
+            FROM venues v
+            JOIN event_venues ev ON ev.venue_id = v.id
+            WHERE venue_name ILIKE %(pattern)s OR %(q)s <%% venue_name
+            OR city ILIKE %(pattern)s OR %(q)s <%% city
+        )
+        SELECT
+            d.event_id, d.name, d.genre, d.event_start_date,
+            v.venue_name, v.city, v.state,
+            GREATEST(
+                word_similarity(%(q)s, d.name),
+                word_similarity(%(q)s, d.genre),
+                COALESCE(word_similarity(%(q)s, v.venue_name), 0),
+                COALESCE(word_similarity(%(q)s, v.city), 0),
+                CASE WHEN d.name ILIKE %(prefix)s THEN 1 ELSE 0 END
+            ) AS score
+        FROM matches m
+        JOIN event_details d ON d.event_id = m.event_id
+        LEFT JOIN event_venues ev ON ev.event_id = d.event_id
+        LEFT JOIN venues v ON v.id = ev.venue_id
+        WHERE NOT %(tracking_only)s OR d.tracking = 1
+        ORDER BY score DESC, d.event_start_date
+        LIMIT %(limit)s
+    """
+    params = {
+        'q': query,
+        'pattern': _like_pattern(query),
+        'prefix': _like_pattern(query)[1:],
+        'tracking_only': tracking_only,
+        'limit': limit
+    }
+    with get_connection(conn) as conn:
+        return pd.read_sql(sql, con=conn, params=params)
@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 import os
-import requests
+from etl.client import get_client
 import json
 
 def extract_venue_data(api_response):
@@ -27,33 +27,32 @@ def extract_venue_data(api_response):
         print("Error extracting venue data:", e)
         return []
 
-# Load in API keys
-load_dotenv()
-
-api_key = os.getenv('CONSUMER_KEY')
-api_url_venue_search = "https://app.ticketmaster.com/discovery/v2/venues.json"
-
-# Specify params
-venue_search = 'Crypto Arena'
-
-params = {
-    "apikey" : api_key,
-    "keyword" : venue_search,
-    "countryCode" : "US"
-}
-
-#Get response TO SEARCH EVENT
-response = requests.get(api_url_venue_search, params = params)
-
-try:
-    if response.status_code == 200:
-        data = response.json()
-
-        venues = extract_venue_data(data)
-        print(venues)
-except Exception as e:
-    print('Failed to get data: ', e)
-
+def search_venues(api_key, keyword):
+    """
+    Search the Discovery API for venues by name.
 
+    Returns:
+        list: {"name", "id"} dicts, empty if nothing matched or the request failed
+    """
+    params = {
+        "apikey" : api_key,
+        "keyword" : keyword,
+        "countryCode" : "US"
+    }
+
+    #Get response TO SEARCH EVENT
+    response = get_client(api_key).get('/venues.json', params=params)
+    if response.status_code != 200:
+        print(f"Venue search failed with status code: {response.status_code}")
+        return []
+    return extract_venue_data(response.json())
 
+if __name__ == "__main__":
+    # Load in API keys
+    load_dotenv()
+    api_key = os.getenv('CONSUMER_KEY')
 
+    try:
+        print(search_venues(api_key, 'Crypto Arena'))
+    except Exception as e:
+        print('Failed to get data: ', e)
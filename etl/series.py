@@ -0,0 +1,204 @@
+"""
+Downsampled daily price series for charts.
+
+Series are read from the events_daily view (so either price storage mode
+works) for many events in one query and reduced to at most `budget` points:
+
+    lttb     Largest-Triangle-Three-Buckets, keeps the visual shape of the line
+    minmax   lowest and highest point of each bucket, keeps every spike
+
+Chart payloads stay the same size however long an event has been tracked.
+Results are cached per (event_id, start, end, budget, method); load_to_sql
+drops an event's entries when it commits new prices for it, and entries
+expire after CACHE_TTL_SECONDS so loads from other processes show up.
+"""
+
+from datetime import date
+import numpy as np
+from etl.db import get_connection
+from etl.lru import GenerationCache
+
+DEFAULT_BUDGET = 500
+CACHE_TTL_SECONDS = 3600
+METHODS = ('lttb', 'minmax')
+
+_cache = GenerationCache(max_size=5000, ttl=CACHE_TTL_SECONDS)
+invalidate = _cache.invalidate
+
+def _check_budget(budget):
+    if budget < 1:
+        raise ValueError(f"budget must be at least 1, got {budget}")
+
+def lttb(x, y, budget):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x (ndarray): Increasing x values (float)
+        y (ndarray): y values, same length
+        budget (int): Points to keep, at least 1
+
+    Returns:
+        ndarray: Indices of the kept points, increasing
+    """
+    _check_budget(budget)
+    n = len(x)
+    if budget >= n:
+        return np.arange(n)
+    # Too few points for a middle bucket: keep the ends
+    if budget < 3:
+        return np.array([0, n - 1][:budget], dtype=np.int64)
+
+    # First and last points are always kept; the rest is split into budget - 2 buckets
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    kept = np.empty(budget, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        # Point of this bucket forming the largest triangle with a and the next average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+def minmax(x, y, budget):
+    """
+    Min/max-bucket downsampling: the lowest and highest point of budget // 2 buckets.
+
+    Returns:
+        ndarray: Indices of the kept points, increasing
+    """
+    _check_budget(budget)
+    n = len(y)
+    buckets = budget // 2
+    if budget >= n:
+        return np.arange(n)
+    if buckets < 1:
+        return np.array([0], dtype=np.int64)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        chunk = y[start:end]
+        kept.append(start + int(np.argmin(chunk)))
+        kept.append(start + int(np.argmax(chunk)))
+    return np.unique(kept)
+
+_DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax}
+
+def load_series(event_ids, start=None, end=None, conn=None):
+    """
+    Daily lowest prices for many events in one query.
+
+    Returns:
+        dict: event_id -> (days as datetime64[D] array, prices as float64 array),
+            days with no known price left out
+    """
+    with get_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT id, date_scraped, min(min_ticket_price)
+                FROM events_daily
+                WHERE id = ANY(%s)
+                AND date_scraped >= COALESCE(%s, '-infinity'::date)
+                AND date_scraped <= COALESCE(%s, 'infinity'::date)
+                AND min_ticket_price IS NOT NULL
+                GROUP BY id, date_scraped
+                ORDER BY id, date_scraped
+            """, (list(event_ids), start, end))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    series = {}
+    if not rows:
+        return series
+    ids, days, prices = zip(*rows)
+    ids = np.array(ids, dtype=object)
+    days = np.array(days, dtype='datetime64[D]')
+    prices = np.array(prices, dtype=np.float64)
+    boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    for lo, hi in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(ids)]))):
+        series[ids[lo]] = (days[lo:hi], prices[lo:hi])
+    return series
+
+def downsample(days, prices, budget=DEFAULT_BUDGET, method='lttb'):
+    """
+    Reduce one series to at most `budget` points.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    kept = _DOWNSAMPLERS[method](days.astype(np.float64), prices, budget)
+    return days[kept], prices[kept]
+
+def get_price_series(event_ids, start=None, end=None, budget=DEFAULT_BUDGET, method='lttb', conn=None):
+    """
+    Downsampled price series for charting, served from the cache where possible.
+
+    Args:
+        event_ids (iterable): Ticketmaster event ids
+        start (date): First day to include, from the beginning if None
+        end (date): Last day to include, up to the latest price if None
+        budget (int): Maximum points per series
+        method (str): 'lttb' or 'minmax'
+        conn: Existing psycopg2 connection to use instead of borrowing one from the pool
+
+    Returns:
+        dict: event_id -> (days, prices) arrays; events without prices in the
+            range get empty arrays
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    _check_budget(budget)
+    start = date.fromisoformat(start) if isinstance(start, str) else start
+    end = date.fromisoformat(end) if isinstance(end, str) else end
+    event_ids = list(dict.fromkeys(event_ids))
+
+    result = {}
+    misses = []
+    for event_id in event_ids:
+        cached = _cache.get((event_id, start, end, budget, method))
+        if cached is not None:
+            result[event_id] = cached
+        else:
+            misses.append(event_id)
+
+    if misses:
+        generation = _cache.generation
+        loaded = load_series(misses, start, end, conn)
+        empty = (np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float64))
+        for event_id in misses:
+            days, prices = loaded.get(event_id, empty)
+            series = downsample(days, prices, budget, method)
+            result[event_id] = series
+            _cache.put((event_id, start, end, budget, method), series, generation)
+
+    return {event_id: result[event_id] for event_id in event_ids}
+
+def series_payload(event_ids, start=None, end=None, budget=DEFAULT_BUDGET, method='lttb', conn=None):
+    """
+    get_price_series() as JSON-ready {event_id: {'x': ['YYYY-MM-DD', ...], 'y': [...]}}
+    for Chart.js / Plotly.
+    """
+    series = get_price_series(event_ids, start, end, budget, method, conn)
+    return {
+        event_id: {'x': np.datetime_as_string(days, unit='D').tolist(), 'y': prices.tolist()}
+        for event_id, (days, prices) in series.items()
+    }
@@ -0,0 +1,62 @@
+"""
+Parquet staging files used to hand DataFrames between pipeline tasks
+without pushing them through Airflow XCom.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import pandas as pd
+
+def staging_dir(run_id):
+    """
+    Directory holding one run's staging files, under TICKET_TRAIL_STAGING_DIR.
+    """
+    root = os.getenv('TICKET_TRAIL_STAGING_DIR', os.path.join(tempfile.gettempdir(), 'ticket_trail'))
+    return os.path.join(root, re.sub(r'[^A-Za-z0-9_.-]', '_', str(run_id)))
+
+def write_frames(frames, run_id, shard=0):
+    """
+    Write each DataFrame to a Parquet file for this run and shard.
+
+    Args:
+        frames (dict): Name -> DataFrame (None entries are passed through)
+        run_id (str): Pipeline run the files belong to
+        shard (int): Shard number, keeps parallel tasks from overwriting each other
+
+    Returns:
+        dict: Name -> file path, or None where the frame was None
+    """
+    directory = staging_dir(run_id)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = {}
+    for name, df in frames.items():
+        if df is None:
+            paths[name] = None
+            continue
+        path = os.path.join(directory, f"{name}_shard{shard}.parquet")
+        df.to_parquet(path, index=False)
+        paths[name] = path
+    return paths
+
+def read_frame(path):
+    """
+    Read a staged DataFrame back, or None if nothing was staged (path is None).
+
+    Raises:
+        FileNotFoundError: A file was staged but isn't there, e.g. it was written
+            to another worker's local disk
+    """
+    if path is None:
+        return None
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Staged file {path} is missing; is TICKET_TRAIL_STAGING_DIR shared by all workers?")
+    return pd.read_parquet(path)
+
+def remove_run(run_id):
+    """
+    Delete every staging file for a run.
+    """
+    shutil.rmtree(staging_dir(run_id), ignore_errors=True)
@@ -1,6 +1,6 @@
-import psycopg2
 import os
 from dotenv import load_dotenv
+from etl.db import connect
 
 def test_connection():
     # Load environment variables
@@ -18,12 +18,7 @@ def test_connection():
     print("\nTesting database connection...")
     try:
         print("Attempting to connect...")
-        conn = psycopg2.connect(
-            host=os.getenv('POSTGRESQL_HOST'),
-            database="ticket_trail_db",
-            user=os.getenv('POSTGRESQL_USER'),
-            password=os.getenv('POSTGRESQL_PASSWORD')
-        )
+        conn = connect()
         print("Connection successful!")
         conn.close()
     except Exception as e:
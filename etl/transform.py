@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
+from etl.profiling import profiled
 
+@profiled('transform')
 def transform(events, event_details, venues_list):
     """
     Transform event data with basic validation
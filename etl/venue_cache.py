@@ -0,0 +1,67 @@
+"""
+In-process cache of venue ids already stored in the venues table.
+
+Loads consult it so venues we already have cost no database round trip,
+and venue detail lookups are only made for venues we haven't seen.
+"""
+
+import threading
+from etl.lru import LRUCache
+
+_known_venues = LRUCache(max_size=50000)
+_warmed = False
+_warm_lock = threading.Lock()
+
+def warm(cursor):
+    """
+    Fill the cache from the venues table once per process.
+    """
+    global _warmed
+    with _warm_lock:
+        if _warmed:
+            return
+        cursor.execute("SELECT id FROM venues LIMIT %s", (_known_venues.max_size,))
+        for (venue_id,) in cursor.fetchall():
+            _known_venues.put(venue_id)
+        _warmed = True
+
+def new_venue_ids(cursor, venue_ids):
+    """
+    Which of `venue_ids` are not in the venues table yet.
+
+    Ids missing from the cache (e.g. evicted ones) are checked against the
+    database in one query before being reported as new.
+
+    Args:
+        cursor: psycopg2 cursor
+        venue_ids (iterable): Ticketmaster venue ids
+
+    Returns:
+        list: Ids that need inserting, in first-seen order
+    """
+    warm(cursor)
+    unknown = [v for v in dict.fromkeys(venue_ids) if v is not None and v not in _known_venues]
+    if not unknown:
+        return []
+
+    cursor.execute("SELECT id FROM venues WHERE id = ANY(%s)", (unknown,))
+    stored = {row[0] for row in cursor.fetchall()}
+    for venue_id in stored:
+        _known_venues.put(venue_id)
+    return [v for v in unknown if v not in stored]
+
+def mark_known(venue_ids):
+    """
+    Record venues as stored. Call only after the transaction inserting them commits.
+    """
+    for venue_id in venue_ids:
+        _known_venues.put(venue_id)
+
+def clear():
+    """
+    Forget every cached venue id.
+    """
+    global _warmed
+    with _warm_lock:
+        _known_venues.clear()
+        _warmed = False
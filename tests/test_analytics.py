@@ -0,0 +1,64 @@
+from datetime import date
+import numpy as np
+import pytest
+from etl.analytics import SIGNAL_COLUMNS, compute_signals
+
+def histories(rows):
+    """
+    load_histories-shaped arrays from (event_id, day, price, event_date) rows.
+    """
+    ids, days, prices, event_dates = zip(*rows)
+    return {
+        'event_id': np.array(ids, dtype=object),
+        'day': np.array(days, dtype='datetime64[D]'),
+        'price': np.array([np.nan if p is None else p for p in prices], dtype=np.float64),
+        'event_date': np.array(['NaT' if d is None else d for d in event_dates], dtype='datetime64[D]'),
+    }
+
+@pytest.fixture
+def signals():
+    rows = [
+        ('A', '2026-01-01', 100.0, '2026-01-20'),
+        ('A', '2026-01-02', 80.0, '2026-01-20'),
+        ('A', '2026-01-03', None, '2026-01-20'),
+        ('A', '2026-01-10', 90.0, '2026-01-20'),
+        ('B', '2026-01-09', 50.0, None),
+    ]
+    df = compute_signals(histories(rows), window_days=7, today=date(2026, 1, 10))
+    return df.set_index('event_id')
+
+def test_one_row_per_event(signals):
+    assert list(signals.reset_index().columns) == SIGNAL_COLUMNS
+    assert signals.index.tolist() == ['A', 'B']
+    assert signals['observations'].tolist() == [4, 1]
+
+def test_price_signals(signals):
+    a = signals.loc['A']
+    assert a['first_price'] == 100.0
+    assert a['current_price'] == 90.0
+    # Unknown prices are skipped
+    assert a['all_time_low'] == 80.0
+    # The 7-day window ending on the 10th only holds the 10th
+    assert a['rolling_min'] == 90.0
+    assert a['pct_change_from_first'] == pytest.approx(-10.0)
+    # 80 and 90 of the known 100, 80, 90 are at or below the current price
+    assert a['current_percentile'] == pytest.approx(200 / 3)
+    assert not a['is_all_time_low']
+
+def test_single_observation(signals):
+    b = signals.loc['B']
+    assert b['rolling_min'] == 50.0
+    assert b['is_all_time_low']
+    assert b['current_percentile'] == 100.0
+    assert b['pct_change_from_first'] == 0.0
+
+def test_days_to_event_buckets(signals):
+    assert signals.loc['A', 'days_to_event'] == 10
+    assert signals.loc['A', 'days_to_event_bucket'] == '7-13'
+    assert np.isnan(signals.loc['B', 'days_to_event'])
+    assert signals.loc['B', 'days_to_event_bucket'] == 'unknown'
+
+def test_no_history():
+    empty = histories([('A', '2026-01-01', 1.0, None)])
+    empty = {key: values[:0] for key, values in empty.items()}
+    assert compute_signals(empty).empty
@@ -0,0 +1,31 @@
+import pandas as pd
+from etl.onboard import dedupe_pages
+
+def make_page(*events):
+    """
+    Row-aligned frames as parse_events builds them, from (event_id, venue_id) pairs.
+    """
+    event_ids = [event_id for event_id, _ in events]
+    return (
+        pd.DataFrame({'id': event_ids, 'min_ticket_price': 10.0, 'date_scraped': '2026-03-01'}),
+        pd.DataFrame({'event_id': event_ids, 'name': [f'Show {e}' for e in event_ids]}),
+        pd.DataFrame({'event_id': event_ids, 'id': [venue_id for _, venue_id in events]}),
+    )
+
+def test_events_from_overlapping_searches_are_kept_once():
+    pages = [
+        make_page(('E1', 'V1'), ('E2', 'V1')),
+        make_page(('E2', 'V1'), ('E3', 'V2')),
+        make_page(('E1', 'V1')),
+    ]
+
+    events_df, details_df, venues_df, stats = dedupe_pages(pages)
+
+    assert events_df['id'].tolist() == ['E1', 'E2', 'E3']
+    assert details_df['event_id'].tolist() == ['E1', 'E2', 'E3']
+    # One venue row per kept event, so every event keeps its venue mapping
+    assert venues_df[['event_id', 'id']].values.tolist() == [['E1', 'V1'], ['E2', 'V1'], ['E3', 'V2']]
+    assert stats == {'events': 3, 'duplicate_events': 2, 'venues': 2}
+
+def test_no_pages():
+    assert dedupe_pages([]) == (None, None, None, {'events': 0, 'duplicate_events': 0, 'venues': 0})
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from etl.extract import PRICE_COLUMNS, parse_events
+
+def make_event(event_id='E1', days_out=30, **overrides):
+    start = (date.today() + timedelta(days=days_out)).isoformat()
+    event = {
+        'id': event_id,
+        'name': f'Show {event_id}',
+        'priceRanges': [{'min': 42.5, 'max': 100.0}],
+        'dates': {'start': {'dateTime': f'{start}T20:00:00Z'}},
+        'classifications': [{'genre': {'name': 'Rock'}}],
+        'sales': {
+            'public': {'startDateTime': '2026-01-01T15:00:00Z', 'endDateTime': f'{start}T20:00:00Z'},
+            'presales': [
+                {'startDateTime': '2025-12-20T15:00:00Z', 'endDateTime': '2025-12-22T03:00:00Z'},
+                {'startDateTime': '2025-12-18T15:00:00Z', 'endDateTime': '2025-12-21T03:00:00Z'},
+            ]
+        },
+        '_embedded': {'venues': [{
+            'id': 'V1', 'name': 'The Hall', 'city': {'name': 'Austin'}, 'state': {'stateCode': 'TX'}
+        }]}
+    }
+    event.update(overrides)
+    return event
+
+def page(*events):
+    return {'_embedded': {'events': list(events)}}
+
+def test_frames_are_row_aligned():
+    events_df, details_df, venues_df = parse_events(page(make_event('E1'), make_event('E2')))
+
+    assert list(events_df.columns) == PRICE_COLUMNS
+    assert events_df['id'].tolist() == ['E1', 'E2']
+    assert details_df['event_id'].tolist() == ['E1', 'E2']
+    assert venues_df['event_id'].tolist() == ['E1', 'E2']
+    assert events_df['min_ticket_price'].tolist() == [42.5, 42.5]
+    assert venues_df.iloc[0][['id', 'venue_name', 'city', 'state']].tolist() == ['V1', 'The Hall', 'Austin', 'TX']
+
+def test_earliest_presale_dates_are_kept():
+    _, details_df, _ = parse_events(page(make_event()))
+
+    assert details_df.loc[0, 'presale_start'] == '2025-12-18T15:00:00Z'
+    assert details_df.loc[0, 'presale_end'] == '2025-12-21T03:00:00Z'
+
+def test_missing_optional_fields():
+    event = make_event(days_out=10)
+    del event['id']
+    del event['name']
+    del event['sales']['presales']
+    event['priceRanges'] = [{'max': 100.0}]
+
+    events_df, details_df, _ = parse_events(page(event))
+
+    assert events_df.loc[0, 'id'] is None
+    assert details_df.loc[0, 'name'] is None
+    assert details_df.loc[0, 'presale_start'] is None
+    assert details_df.loc[0, 'presale_end'] is None
+    # A price range without a minimum counts as 0
+    assert events_df.loc[0, 'min_ticket_price'] == 0
+
+def test_tracking_follows_the_event_date():
+    _, details_df, _ = parse_events(page(make_event('E1', days_out=5), make_event('E2', days_out=-5)))
+
+    assert details_df['tracking'].tolist() == [1, 0]
+    assert (details_df['last_tracked'] == date.today().isoformat()).all()
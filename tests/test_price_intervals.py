@@ -0,0 +1,90 @@
+"""
+merge_price_intervals against a throwaway PostgreSQL cluster (skipped when
+the server binaries aren't available, see benchmarks/postgres.py).
+"""
+
+from datetime import date
+import os
+import subprocess
+import pytest
+from benchmarks.postgres import ThrowawayPostgres
+
+EVENT = 'E1'
+
+@pytest.fixture(scope='module')
+def conn():
+    try:
+        pg = ThrowawayPostgres().start()
+    except (RuntimeError, OSError, subprocess.CalledProcessError) as e:
+        pytest.skip(f"No throwaway PostgreSQL available: {e}")
+
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+    from etl.db import DB_NAME, connect
+    from etl.migrate import migrate
+
+    previous = {key: os.environ.get(key) for key in pg.env}
+    os.environ.update(pg.env)
+    try:
+        admin = connect(database='postgres')
+        admin.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        admin.cursor().execute(f'CREATE DATABASE {DB_NAME}')
+        admin.close()
+
+        conn = connect()
+        migrate(conn)
+        yield conn
+        conn.close()
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        pg.stop()
+
+def load_prices(conn, rows):
+    from etl.load import merge_price_intervals
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMP TABLE incoming (id VARCHAR(50), min_ticket_price FLOAT, date_scraped DATE)
+        ON COMMIT DROP
+    """)
+    cursor.executemany("INSERT INTO incoming VALUES (%s, %s, %s)", rows)
+    merge_price_intervals(cursor, 'incoming')
+    conn.commit()
+    cursor.close()
+
+def intervals(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT min_ticket_price, valid_from, valid_to, is_current
+        FROM event_price_intervals
+        WHERE event_id = %s
+        ORDER BY valid_from
+    """, (EVENT,))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+def test_runs_split_on_price_changes_and_bridge_gaps(conn):
+    for day, price in [(1, 10.0), (2, 10.0), (3, 12.0), (6, 12.0), (7, 10.0)]:
+        load_prices(conn, [(EVENT, price, date(2026, 1, day))])
+
+    assert intervals(conn) == [
+        (10.0, date(2026, 1, 1), date(2026, 1, 2), False),
+        # An unchanged price after days without a scrape extends the same run
+        (12.0, date(2026, 1, 3), date(2026, 1, 6), False),
+        (10.0, date(2026, 1, 7), date(2026, 1, 7), True),
+    ]
+
+    # A second load on the same day replaces that day's price
+    load_prices(conn, [(EVENT, 9.0, date(2026, 1, 7))])
+    assert intervals(conn)[-1] == (9.0, date(2026, 1, 7), date(2026, 1, 7), True)
+
+    # The lowest price in a batch wins
+    load_prices(conn, [(EVENT, 9.0, date(2026, 1, 8)), (EVENT, 8.0, date(2026, 1, 8))])
+    assert intervals(conn)[-2:] == [
+        (9.0, date(2026, 1, 7), date(2026, 1, 7), False),
+        (8.0, date(2026, 1, 8), date(2026, 1, 8), True),
+    ]
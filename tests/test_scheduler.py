@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+from etl.scheduler import (
+    DEFAULT_POLL_HOURS, MIN_POLL_HOURS, RETRY_MAX_HOURS, SALE_WINDOW_POLL_HOURS,
+    compute_next_poll, compute_retry_poll
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+def details(*rows):
+    return pd.DataFrame(
+        [
+            {
+                'event_id': event_id,
+                'event_start_date': (NOW + timedelta(days=days_out)).date(),
+                'presale_start': None,
+                'public_sales_start': (NOW + timedelta(days=sale_in)).date() if sale_in is not None else None,
+                'tracking': tracking
+            }
+            for event_id, days_out, sale_in, tracking in rows
+        ]
+    )
+
+def hours_until(next_poll):
+    return [None if ts is None else (ts - NOW) / timedelta(hours=1) for ts in next_poll]
+
+def test_interval_shrinks_as_the_event_gets_close():
+    df = details(('soon', 3, None, 1), ('month', 20, None, 1), ('quarter', 60, None, 1), ('far', 200, None, 1))
+    assert hours_until(compute_next_poll(df, now=NOW)) == [6, 12, 24, DEFAULT_POLL_HOURS]
+
+def test_sales_and_volatility_poll_more_often_but_not_below_the_minimum():
+    df = details(('on_sale', 200, 1, 1), ('volatile', 20, None, 1), ('both', 200, 1, 1))
+    next_poll = compute_next_poll(df, now=NOW, volatility={'volatile': 0.5, 'both': 0.5})
+    assert hours_until(next_poll) == [SALE_WINDOW_POLL_HOURS, 6, MIN_POLL_HOURS]
+
+def test_untracked_events_get_no_poll_time():
+    df = details(('done', -1, None, 0), ('live', 3, None, 1))
+    assert hours_until(compute_next_poll(df, now=NOW)) == [None, 6]
+
+def test_poll_times_are_utc():
+    naive = NOW.replace(tzinfo=None)
+    next_poll = compute_next_poll(details(('e', 3, None, 1)), now=naive)
+    assert next_poll[0] == NOW + timedelta(hours=6)
+    assert next_poll[0].utcoffset() == timedelta(0)
+
+def test_retry_backoff_doubles_within_bounds():
+    failed_polls = pd.Series([1, 2, 3, 5, 50], index=[10, 11, 12, 13, 14])
+    retry = compute_retry_poll(failed_polls, now=NOW)
+
+    assert hours_until(retry) == [MIN_POLL_HOURS, 4, 8, 32, RETRY_MAX_HOURS]
+    assert list(retry.index) == [10, 11, 12, 13, 14]
+    assert all(MIN_POLL_HOURS <= hours <= RETRY_MAX_HOURS for hours in hours_until(retry))
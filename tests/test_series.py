@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from etl.series import downsample, lttb, minmax
+
+N = 1000
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    x = np.arange(N, dtype=np.float64)
+    y = rng.normal(100, 5, N).cumsum()
+    # A single spike a downsampler must not lose
+    y[637] += 10000
+    return x, y
+
+@pytest.mark.parametrize('method', [lttb, minmax])
+@pytest.mark.parametrize('budget', [1, 2, 3, 4, 10, 101, 500])
+def test_budget_is_respected(series, method, budget):
+    kept = method(*series, budget)
+    assert 1 <= len(kept) <= budget
+    assert np.all(np.diff(kept) > 0)
+    assert kept[0] >= 0 and kept[-1] < N
+
+@pytest.mark.parametrize('budget', [2, 3, 10, 500])
+def test_lttb_keeps_both_ends(series, budget):
+    kept = lttb(*series, budget)
+    assert kept[0] == 0
+    assert kept[-1] == N - 1
+
+@pytest.mark.parametrize('budget', [2, 10, 500])
+def test_minmax_keeps_extremes(series, budget):
+    _, y = series
+    kept = minmax(*series, budget)
+    assert np.argmax(y) in kept
+    assert np.argmin(y) in kept
+
+@pytest.mark.parametrize('method', [lttb, minmax])
+def test_small_budgets_keep_the_first_point(series, method):
+    assert method(*series, 1).tolist() == [0]
+
+@pytest.mark.parametrize('method', [lttb, minmax])
+def test_short_series_are_returned_whole(method):
+    x = np.arange(5, dtype=np.float64)
+    assert method(x, x * 2, 5).tolist() == [0, 1, 2, 3, 4]
+    assert method(x, x * 2, 50).tolist() == [0, 1, 2, 3, 4]
+
+@pytest.mark.parametrize('method', [lttb, minmax])
+def test_budget_below_one_is_rejected(series, method):
+    with pytest.raises(ValueError):
+        method(*series, 0)
+
+def test_downsample_returns_matching_days_and_prices():
+    days = np.arange('2026-01-01', '2026-12-31', dtype='datetime64[D]')
+    prices = np.linspace(50, 150, len(days))
+    out_days, out_prices = downsample(days, prices, budget=20)
+    assert len(out_days) == len(out_prices) <= 20
+    assert out_days[0] == days[0] and out_days[-1] == days[-1]
+    np.testing.assert_allclose(out_prices, prices[np.searchsorted(days, out_days)])
+
+    with pytest.raises(ValueError):
+        downsample(days, prices, method='mean')